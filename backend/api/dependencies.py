@@ -1,13 +1,26 @@
 # In backend/api/dependencies.py
 
 from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from bson import ObjectId
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Path, status
 from motor.motor_asyncio import AsyncIOMotorClient
 from core.database import get_database, get_user_collection
 from core.security import get_current_user_id
 from models.user import UserModel, PyObjectId
 
 
+# --- Authenticated User Cache ---
+# Plain module-level cache (not fastapi-cache's @cache, whose key builder chokes on
+# dependency-injected arguments). Keyed by the token's user_id string.
+_USER_CACHE: TTLCache[str, dict] = TTLCache(maxsize=10_000, ttl=60)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drops a cached user document. Call this from any endpoint that mutates a user."""
+    _USER_CACHE.pop(str(user_id), None)
+
+
 # --- Database Dependencies ---
 
 def get_db_client() -> AsyncIOMotorClient:
@@ -15,6 +28,21 @@ def get_db_client() -> AsyncIOMotorClient:
     return get_database()
 
 
+# --- ID Parsing Dependencies ---
+
+def parse_object_id(application_id: str) -> ObjectId:
+    """Converts an application ID string to an ObjectId, rejecting malformed IDs with a 400."""
+    # A cheap validity check instead of try/except around the ObjectId constructor
+    if not ObjectId.is_valid(application_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Application ID format.")
+    return ObjectId(application_id)
+
+
+def get_application_object_id(application_id: Annotated[str, Path()]) -> ObjectId:
+    """Dependency that parses the `{application_id}` path parameter into an ObjectId."""
+    return parse_object_id(application_id)
+
+
 # --- Authentication Dependencies ---
 
 async def get_current_user(user_id: Annotated[str, Depends(get_current_user_id)]) -> UserModel:
@@ -22,29 +50,34 @@ async def get_current_user(user_id: Annotated[str, Depends(get_current_user_id)]
     Dependency that fetches the full UserModel for the currently authenticated user.
     Requires a valid JWT token.
     """
-    user_collection = get_user_collection()
+    user_doc = _USER_CACHE.get(user_id)
 
-    # We must ensure the user_id from the token is a valid ObjectId for MongoDB query
-    try:
-        object_id = PyObjectId(user_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token subject format",
-        )
+    if user_doc is None:
+        user_collection = get_user_collection()
 
-    # Fetch user document from MongoDB
-    user_doc = await user_collection.find_one({"_id": object_id})
+        # We must ensure the user_id from the token is a valid ObjectId for MongoDB query
+        try:
+            object_id = PyObjectId(user_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token subject format",
+            )
 
-    if user_doc is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or credentials invalid",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    # Convert MongoDB document to Pydantic model
-    return UserModel(**user_doc)
+        # Fetch user document from MongoDB (the password hash is never needed here)
+        user_doc = await user_collection.find_one({"_id": object_id}, {"hashed_password": 0})
+
+        if user_doc is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found or credentials invalid",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        _USER_CACHE[user_id] = user_doc
+
+    # Trusted DB document (we wrote it), so skip re-validation
+    return UserModel.model_construct(**user_doc)
 
 
 # Reusable dependencies for endpoints
@@ -1,25 +1,33 @@
 # In backend/api/endpoints/applications.py
 
+import logging
 import os
-from datetime import datetime
-from typing import Annotated, Dict, Any
+from datetime import datetime, timezone
+from typing import Annotated, Dict, Any, Optional
 
-from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks, Form, UploadFile
+from fastapi import APIRouter, HTTPException, status, Depends, Form, Header, Response, UploadFile
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 # --- CORE IMPORTS ---
 from core.database import get_application_collection
+from core.task_queue import get_task_queue
 from core.config import settings
 # UPDATED: Import get_current_user function directly (CurrentUser alias was removed/deprecated)
-from api.dependencies import DBSession, get_current_user
+from api.dependencies import DBSession, get_current_user, get_application_object_id, parse_object_id
+from api.http_cache import make_etag, etag_matches
 from models.user import UserModel, PyObjectId
 from models.application import ApplicationModel, InitialApplicationCreate, PhotoMetadata
-from services.ml_pipeline import run_verification_pipeline
 from services.storage import save_uploaded_files, get_storage_path
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Statuses from which verification photos may be (re)submitted
+VERIFIABLE_STATUSES = ["initial_application", "rejected"]
+
 
 # --- 1. INITIAL APPLICATION SUBMISSION (Step 1: POST /api/v1/applications/apply) ---
 
@@ -58,7 +66,7 @@ async def initial_application(
         "inverter_photo": None,
 
         "status": "initial_application",
-        "submission_date": datetime.now().isoformat(),
+        "submission_date": datetime.now(timezone.utc),  # Stored as a native BSON date
         "verification_report": None,
     }
 
@@ -75,7 +83,6 @@ async def initial_application(
 
 @router.post("/submit", status_code=status.HTTP_202_ACCEPTED)
 async def submit_verification(
-        background_tasks: BackgroundTasks,
         # FIXED DEPENDENCY: Use Annotated with Depends(get_current_user)
         current_user: Annotated[UserModel, Depends(get_current_user)],
         # The ID from the initial step is passed as a Form field (Crucial for matching)
@@ -96,15 +103,14 @@ async def submit_verification(
     app_collection = get_application_collection()
     user_id_str = str(current_user.id)
 
-    # 1. Validate and Fetch Existing Application
-    try:
-        app_object_id = ObjectId(application_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Application ID format.")
+    # 1. Validate Application ID
+    app_object_id = parse_object_id(application_id)
 
-    # Query by ID and ensure it belongs to the current user
+    # Ownership and status are checked before anything is written to storage, so a
+    # rejected request can never overwrite the photos of a verification in progress
     app_doc = await app_collection.find_one(
-        {"_id": app_object_id, "user_id": current_user.id}
+        {"_id": app_object_id, "user_id": current_user.id},
+        projection={"status": 1},
     )
 
     if app_doc is None:
@@ -112,7 +118,7 @@ async def submit_verification(
                             detail="Application not found or does not belong to user.")
 
     # Ensure it's ready for verification (i.e., status is initial_application or rejected)
-    if app_doc.get("status") not in ["initial_application", "rejected"]:
+    if app_doc.get("status") not in VERIFIABLE_STATUSES:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail=f"Application status is {app_doc.get('status')}. Cannot submit verification photos.")
 
@@ -127,16 +133,18 @@ async def submit_verification(
             }
         )
     except Exception as e:
-        print(f"File upload failed: {e}")
+        logger.exception("File upload failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not save uploaded files."
         )
 
     # 3. Update the Database Document with new verification data
-    wide_photo_metadata = PhotoMetadata(s3_key=file_keys["wide_rooftop"])
-    serial_photo_metadata = PhotoMetadata(s3_key=file_keys["serial_number"])
-    inverter_photo_metadata = PhotoMetadata(s3_key=file_keys["inverter"])
+    # The keys come from our own storage layer and the form fields were already
+    # coerced by FastAPI, so the metadata is built without re-validation.
+    wide_photo_metadata = PhotoMetadata.model_construct(s3_key=file_keys["wide_rooftop"])
+    serial_photo_metadata = PhotoMetadata.model_construct(s3_key=file_keys["serial_number"])
+    inverter_photo_metadata = PhotoMetadata.model_construct(s3_key=file_keys["inverter"])
 
     update_data = {
         "registered_lat": registered_lat,
@@ -147,19 +155,27 @@ async def submit_verification(
         "status": "verifying",
     }
 
-    await app_collection.update_one(
-        {"_id": app_object_id},
-        {"$set": update_data}
+    # The filter repeats the ownership and status precondition, so a concurrent submission
+    # that won the race since the check above cannot be transitioned twice.
+    updated_app_doc = await app_collection.find_one_and_update(
+        {
+            "_id": app_object_id,
+            "user_id": current_user.id,
+            "status": {"$in": VERIFIABLE_STATUSES},
+        },
+        {"$set": update_data},
+        return_document=ReturnDocument.AFTER,
     )
 
-    # Retrieve the full document to pass to the ML pipeline (includes initial details)
-    updated_app_doc = await app_collection.find_one({"_id": app_object_id})
+    if updated_app_doc is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Application is no longer awaiting verification photos.")
 
     # 4. 🚀 Trigger Asynchronous Verification Pipeline
-    background_tasks.add_task(
-        run_verification_pipeline,
+    # The pipeline re-fetches the document, so only the ID and email are enqueued.
+    await get_task_queue().enqueue_job(
+        "run_verification_pipeline",
         application_id,
-        updated_app_doc,
         current_user.email
     )
 
@@ -173,21 +189,20 @@ async def submit_verification(
 
 @router.get("/{application_id}", response_model=ApplicationModel)
 async def get_application_details(
-        application_id: str,
+        app_object_id: Annotated[ObjectId, Depends(get_application_object_id)],
         # FIXED DEPENDENCY: Use Annotated with Depends(get_current_user)
         current_user: Annotated[UserModel, Depends(get_current_user)],
         db_client: DBSession,
+        response: Response,
+        if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     """
     Retrieves the status and verification report for a specific application.
+    The document is read on every request; a matching If-None-Match only turns the
+    response into a bodiless 304.
     """
     app_collection = get_application_collection()
 
-    try:
-        app_object_id = ObjectId(application_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Application ID format.")
-
     # Query by ID and ensure it belongs to the current user
     app_doc = await app_collection.find_one(
         {"_id": app_object_id, "user_id": current_user.id}
@@ -196,4 +211,12 @@ async def get_application_details(
     if app_doc is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found.")
 
-    return ApplicationModel(**app_doc)
\ No newline at end of file
+    etag = make_etag(app_doc)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+    # FastAPI validates the document against response_model once; building an
+    # ApplicationModel here as well would validate it twice.
+    return app_doc
\ No newline at end of file
@@ -4,11 +4,12 @@ from datetime import timedelta
 from typing import Annotated
 
 from core.database import get_user_collection
-from core.security import get_password_hash, verify_password, create_access_token
+from core.security import get_password_hash_async, verify_password_async, create_access_token
 from core.config import settings
 from models.user import UserCreate, UserOut
 from api.dependencies import DBSession
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter()
 
@@ -23,16 +24,8 @@ async def register_user(
     """
     users_collection = get_user_collection()
 
-    # Check if user already exists
-    existing_user = await users_collection.find_one({"email": user_in.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists"
-        )
-
-    # Hash the password (Truncation handled in utils/security.py)
-    hashed_password = get_password_hash(user_in.password)
+    # Hash the password (Argon2, see core/security.py)
+    hashed_password = await get_password_hash_async(user_in.password)
 
     # Create the user document
     user_doc = {
@@ -43,19 +36,21 @@ async def register_user(
         "is_active": True
     }
 
-    # Insert into MongoDB
-    insert_result = await users_collection.insert_one(user_doc)
-
-    # Fetch the inserted document
-    new_user = await users_collection.find_one({"_id": insert_result.inserted_id})
+    # Insert into MongoDB; the unique email index rejects existing users atomically
+    try:
+        insert_result = await users_collection.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
 
-    # FIX: Explicitly convert the ObjectId to a string before validation.
-    # This guarantees the UserOut model receives the string it needs for the 'id' field.
-    if new_user and '_id' in new_user:
-        new_user['_id'] = str(new_user['_id'])
+    # Build the response from the in-memory document; no refetch needed.
+    # UserOut converts the ObjectId to its str id field itself.
+    user_doc["_id"] = insert_result.inserted_id
 
     # Use Pydantic V2's model_validate with from_attributes=True
-    return UserOut.model_validate(new_user, from_attributes=True)
+    return UserOut.model_validate(user_doc, from_attributes=True)
 
 
 @router.post("/token")
@@ -71,7 +66,7 @@ async def login_for_access_token(
 
     user_doc = await users_collection.find_one({"email": form_data.username})
 
-    if user_doc is None or not verify_password(form_data.password, user_doc["hashed_password"]):
+    if user_doc is None or not await verify_password_async(form_data.password, user_doc["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1,13 +1,17 @@
 # In backend/api/endpoints/verifications.py
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Response
 from bson import ObjectId
-from typing import Annotated
+from typing import Annotated, Optional
 
 from core.database import get_application_collection
 # UPDATED: Import get_current_user directly (CurrentUser alias was removed from dependencies.py)
-from api.dependencies import DBSession, get_current_user
-from models.application import ApplicationModel, VerificationReport
+from api.dependencies import DBSession, get_current_user, get_application_object_id
+from api.http_cache import (
+    FINAL_STATUS, FINAL_REPORT_MAX_AGE,
+    get_cached_report, cache_report, make_etag, etag_matches
+)
+from models.application import VerificationReport
 from models.user import UserModel  # Used for type hinting
 
 router = APIRouter()
@@ -19,46 +23,67 @@ router = APIRouter()
     tags=["verifications"]
 )
 async def get_verification_report(
-        application_id: str,
+        app_object_id: Annotated[ObjectId, Depends(get_application_object_id)],
         # CORRECTED DEPENDENCY: Use the function directly with Depends(get_current_user)
         current_user: Annotated[UserModel, Depends(get_current_user)],
         db_client: DBSession,
+        response: Response,
+        if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     """
     Retrieves the detailed verification report for a specific application
     if the status is 'approved', 'rejected', or 'manual_review'.
+    Every response carries an ETag for If-None-Match. Approved reports, which never
+    change, are also cached for a few minutes, so their polls skip the database.
     """
-    app_collection = get_application_collection()
+    application_id, user_id = str(app_object_id), str(current_user.id)
 
-    try:
-        app_object_id = ObjectId(application_id)
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Application ID format.")
+    cached = get_cached_report(application_id, user_id)
+    if cached is not None:
+        etag, report = cached
+        cache_control = f"private, max-age={FINAL_REPORT_MAX_AGE}"
+    else:
+        app_collection = get_application_collection()
 
-    # Query by ID and ensure it belongs to the current user
-    app_doc = await app_collection.find_one(
-        {"_id": app_object_id, "user_id": current_user.id}
-    )
+        # Query by ID and ensure it belongs to the current user (only the fields read below)
+        app_doc = await app_collection.find_one(
+            {"_id": app_object_id, "user_id": current_user.id},
+            projection={"status": 1, "verification_report": 1}
+        )
 
-    if app_doc is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found.")
+        if app_doc is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found.")
 
-    # Convert the document to the full ApplicationModel for status check
-    application = ApplicationModel(**app_doc)
+        app_status = app_doc.get("status")
 
-    # UPDATED STATUS CHECK: Added "initial_application" to indicate report is not ready yet.
-    if application.status in ["initial_application", "verifying"]:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Verification for this application is still in progress. Current status: {application.status}"
-        )
+        # UPDATED STATUS CHECK: Added "initial_application" to indicate report is not ready yet.
+        if app_status in ["initial_application", "verifying"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Verification for this application is still in progress. Current status: {app_status}"
+            )
 
-    # Return the embedded report
-    if application.verification_report is None:
-        # Should not happen if status is final, but acts as a safeguard
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Final status reached, but report content is missing."
-        )
+        # Return the embedded report
+        report = app_doc.get("verification_report")
+        if report is None:
+            # Should not happen if status is final, but acts as a safeguard
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Final status reached, but report content is missing."
+            )
+
+        etag = make_etag({"status": app_status, "verification_report": report})
+        if app_status == FINAL_STATUS:
+            cache_report(application_id, user_id, etag, report)
+            cache_control = f"private, max-age={FINAL_REPORT_MAX_AGE}"
+        else:
+            # Rejected and manual-review reports may change; clients revalidate with the ETag
+            cache_control = "private, no-cache"
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return application.verification_report
\ No newline at end of file
+    response.headers.update(headers)
+    # FastAPI validates the dict against response_model once; no intermediate model needed
+    return report
\ No newline at end of file
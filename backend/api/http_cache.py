@@ -0,0 +1,45 @@
+# In backend/api/http_cache.py
+
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+import bson
+from cachetools import TTLCache
+
+
+# An approved report can never change: approved applications cannot be resubmitted.
+# Rejected reports are excluded because a resubmission may be handled by another worker,
+# which could not invalidate this per-process cache (nor a browser's copy).
+FINAL_STATUS = "approved"
+FINAL_REPORT_MAX_AGE = 300  # seconds
+
+# --- Final Report Cache ---
+# Keyed by (application_id, user_id) so ownership is part of the key.
+_REPORT_CACHE: TTLCache[Tuple[str, str], Tuple[str, Dict[str, Any]]] = TTLCache(
+    maxsize=10_000, ttl=FINAL_REPORT_MAX_AGE
+)
+
+
+def get_cached_report(application_id: str, user_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Returns (etag, report) for a cached approved report, or None."""
+    return _REPORT_CACHE.get((application_id, user_id))
+
+
+def cache_report(application_id: str, user_id: str, etag: str, report: Dict[str, Any]) -> None:
+    """Stores an approved report with its ETag."""
+    _REPORT_CACHE[(application_id, user_id)] = (etag, report)
+
+
+# --- ETag Helpers ---
+
+def make_etag(document: Dict[str, Any]) -> str:
+    """Strong ETag over the BSON encoding of a document (a single C-level pass)."""
+    return f'"{hashlib.md5(bson.encode(document)).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Implements the If-None-Match comparison for a single strong ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
\ No newline at end of file
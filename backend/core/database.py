@@ -1,13 +1,21 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from core.config import settings
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 class DataBase:
     """Manages the MongoDB Atlas connection."""
     client: Optional[AsyncIOMotorClient] = None
     db_name: str = settings.MONGO_DB_NAME
 
+    # Handles resolved once at startup so request paths skip the lookups
+    database: Optional[AsyncIOMotorDatabase] = None
+    users: Optional[AsyncIOMotorCollection] = None
+    applications: Optional[AsyncIOMotorCollection] = None
+
 
 db = DataBase()
 
@@ -19,16 +27,31 @@ async def connect_to_mongo():
         db.client = AsyncIOMotorClient(
             settings.MONGO_DB_URI,
             serverSelectionTimeoutMS=5000,
-            uuidRepresentation="standard"
+            uuidRepresentation="standard",
+            # Enlarged pool for the async workload, with a warm floor of connections kept open
+            maxPoolSize=200,
+            minPoolSize=20,
+            maxIdleTimeMS=60000,
+            # Wire compression; the driver negotiates the first one the server supports
+            compressors="zstd,snappy,zlib",
+            retryWrites=True,
+            w="majority",
         )
 
+        db.database = db.client[db.db_name]
+        db.users = db.database["users"]
+        db.applications = db.database["applications"]
+
         # Test the connection to Atlas
         await db.client.admin.command('ping')
-        print(f"MongoDB Atlas connection established to database: {db.db_name}")
+
+        # Indexes backing the per-user application lookups and unique registration emails
+        await db.applications.create_index([("user_id", 1), ("submission_date", -1)])
+        await db.users.create_index("email", unique=True)
+        logger.info("MongoDB Atlas connection established to database: %s", db.db_name)
 
     except Exception as e:
-        print(f"❌ ERROR: Could not connect to MongoDB Atlas. Check URI and Network Access.")
-        print(f"Details: {e}")
+        logger.error("Could not connect to MongoDB Atlas. Check URI and Network Access. Details: %s", e)
         # In a production environment, you might stop the application here
         # or implement retry logic.
 
@@ -37,22 +60,22 @@ async def close_mongo_connection():
     """Closes the MongoDB Atlas connection."""
     if db.client:
         db.client.close()
-        print("MongoDB Atlas connection closed.")
+        logger.info("MongoDB Atlas connection closed.")
 
 
 def get_database():
     """Dependency injection function to get the specific database instance."""
     # The database name is appended to the client connection
-    if not db.client:
+    if db.database is None:
         # Should not happen if startup hook is correct, but safe check
         raise ConnectionError("MongoDB client is not initialized.")
-    return db.client[db.db_name]
+    return db.database
 
 
 # Global access point for collections
 def get_user_collection():
-    return get_database()["users"]
+    return db.users
 
 
 def get_application_collection():
-    return get_database()["applications"]
\ No newline at end of file
+    return db.applications
\ No newline at end of file
@@ -0,0 +1,37 @@
+import logging
+import httpx
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """Holds the shared outbound HTTP client (PVWatts, Expo push)."""
+    client: Optional[httpx.AsyncClient] = None
+
+
+http = HttpClient()
+
+
+async def open_http_client():
+    """Creates the pooled client so TCP/TLS connections are reused across calls."""
+    http.client = httpx.AsyncClient(
+        http2=True,
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=50),
+    )
+    logger.info("Shared HTTP client created.")
+
+
+async def close_http_client():
+    """Closes the shared client and its pooled connections."""
+    if http.client:
+        await http.client.aclose()
+        logger.info("Shared HTTP client closed.")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Access point for services making outbound HTTP calls."""
+    if http.client is None:
+        raise ConnectionError("HTTP client is not initialized.")
+    return http.client
@@ -0,0 +1,23 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Routes all log records through a queue so the event loop only enqueues them.
+    A background QueueListener thread does the actual (blocking) stdout writes.
+    The caller must stop() the returned listener on shutdown to flush it.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.handlers = [QueueHandler(log_queue)]
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
\ No newline at end of file
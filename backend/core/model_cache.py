@@ -0,0 +1,64 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCache:
+    """
+    LRU cache for loaded ML models. Before a new model is admitted, least recently
+    used models are evicted while the cache is full or free GPU memory is below
+    MODEL_MEMORY_FREE_THRESHOLD of the device total.
+    """
+
+    def __init__(self, max_models: int, free_threshold: float):
+        self.max_models = max_models
+        self.free_threshold = free_threshold
+        self._models: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Returns the cached model for key, loading it with loader() on a miss."""
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+
+            self._make_room()
+            model = loader()
+            # Failed loads (None) are not cached so a later call can retry
+            if model is not None:
+                self._models[key] = model
+            return model
+
+    def _make_room(self):
+        while len(self._models) >= self.max_models:
+            self._evict_oldest()
+        while self._models and self._gpu_under_pressure():
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        key, model = self._models.popitem(last=False)
+        del model
+        logger.info("Evicted model '%s' from the model cache.", key)
+
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _gpu_under_pressure(self) -> bool:
+        import torch
+        if not torch.cuda.is_available():
+            return False
+        free, total = torch.cuda.mem_get_info()
+        return free < self.free_threshold * total
+
+
+model_cache = ModelCache(
+    max_models=settings.MODEL_CACHE_MAX_MODELS,
+    free_threshold=settings.MODEL_MEMORY_FREE_THRESHOLD,
+)
@@ -1,17 +1,31 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Optional
+from typing import Annotated, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import jwt
+from cachetools import TTLCache
 
 from core.config import settings
 
 # ============================================================
-# PASSWORD HASHING CONTEXT (Argon2 – modern, secure, no limits)
+# PASSWORD HASHER (Argon2 – modern, secure, no limits)
 # ============================================================
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# argon2-cffi is called directly; passlib's scheme dispatch added per-call overhead.
+# Hashes are standard $argon2id$ strings, so existing passlib hashes still verify.
+# Cost parameters come from settings; verification reads them from each stored hash.
+password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# JWT signing key, encoded once so encode/decode skip the str -> bytes step per call.
+# For an asymmetric ALGORITHM, load the key object here once instead.
+_SECRET_BYTES = settings.SECRET_KEY.encode()
 
 # OAuth2 password token scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
@@ -26,14 +40,30 @@ def get_password_hash(password: str) -> str:
     Hash a password using Argon2.
     Argon2 has NO 72-byte limit like bcrypt.
     """
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password using Argon2.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+# Argon2 is deliberately CPU-heavy; async handlers must use these wrappers so the
+# hash runs in a worker thread instead of blocking the event loop.
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password with Argon2 in a worker thread."""
+    return await asyncio.to_thread(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password with Argon2 in a worker thread."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
 
 
 # ============================================================
@@ -56,12 +86,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
     encoded_jwt = jwt.encode(
         to_encode,
-        settings.SECRET_KEY,
+        _SECRET_BYTES,
         algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
+# Decoded (sub, exp) claims per raw token. Entries age out after 60s so dead
+# tokens do not linger; expiry itself is still checked on every request.
+_TOKEN_CACHE: TTLCache[str, Tuple[Optional[str], Optional[int]]] = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _decode_token(token: str) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Decodes and verifies a JWT once per distinct token, returning (sub, exp).
+    Invalid tokens raise jwt.PyJWTError and are never cached.
+    """
+    claims = _TOKEN_CACHE.get(token)
+    if claims is None:
+        payload = jwt.decode(
+            token,
+            _SECRET_BYTES,
+            algorithms=[settings.ALGORITHM],
+            options={"require": ["exp", "sub"]},
+        )
+        claims = (payload.get("sub"), payload.get("exp"))
+        _TOKEN_CACHE[token] = claims
+    return claims
+
+
 def get_user_id_from_token(token: str) -> str:
     """Extracts user_id (sub) from JWT token."""
     credentials_exception = HTTPException(
@@ -71,18 +124,19 @@ def get_user_id_from_token(token: str) -> str:
     )
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        return user_id
-    except JWTError:
+        user_id, expires_at = _decode_token(token)
+    except jwt.PyJWTError:
         raise credentials_exception
 
+    if user_id is None:
+        raise credentials_exception
+
+    # The decoded claims are cached, so expiry must be re-checked on every call
+    if expires_at is not None and expires_at <= datetime.now(timezone.utc).timestamp():
+        raise credentials_exception
+
+    return user_id
+
 
 # ============================================================
 # FASTAPI DEPENDENCY FOR PROTECTED ROUTES
@@ -0,0 +1,40 @@
+import logging
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+from core.config import settings
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Manages the arq Redis pool used to enqueue background jobs."""
+    pool: Optional[ArqRedis] = None
+
+
+task_queue = TaskQueue()
+
+
+def get_redis_settings() -> RedisSettings:
+    """Redis connection settings shared by the API and the arq worker."""
+    return RedisSettings.from_dsn(settings.REDIS_URL)
+
+
+async def connect_to_task_queue():
+    """Opens the arq Redis pool."""
+    task_queue.pool = await create_pool(get_redis_settings())
+    logger.info("Task queue connection established.")
+
+
+async def close_task_queue():
+    """Closes the arq Redis pool."""
+    if task_queue.pool:
+        await task_queue.pool.close()
+        logger.info("Task queue connection closed.")
+
+
+def get_task_queue() -> ArqRedis:
+    """Access point for enqueuing jobs from endpoints."""
+    if task_queue.pool is None:
+        raise ConnectionError("Task queue is not initialized.")
+    return task_queue.pool
\ No newline at end of file
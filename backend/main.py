@@ -1,3 +1,4 @@
+import logging
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
@@ -5,25 +6,43 @@ from starlette.middleware.cors import CORSMiddleware
 
 from core.config import settings
 from core.database import connect_to_mongo, close_mongo_connection
+from core.security import get_password_hash_async
+from core.task_queue import connect_to_task_queue, close_task_queue
+from core.http_client import open_http_client, close_http_client
+from core.logging_config import setup_logging
 from api.endpoints import auth, applications, verifications
 
+logger = logging.getLogger(__name__)
+
 # --- Application Lifespan Context Manager ---
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Handles startup and shutdown events for the application.
-    - Startup: Connect to MongoDB Atlas.
-    - Shutdown: Close MongoDB connection.
+    - Startup: Connect to MongoDB Atlas and the task queue, open the shared HTTP client,
+      warm up the Argon2 hasher.
+    - Shutdown: Close the HTTP client, task queue and MongoDB connections.
     """
-    print("Application Startup: Connecting to MongoDB Atlas...")
+    log_listener = setup_logging()
+
+    logger.info("Application Startup: Connecting to MongoDB Atlas...")
     await connect_to_mongo()
+    await connect_to_task_queue()
+    await open_http_client()
+
+    # Load the Argon2 backend now rather than on the first login/register request
+    await get_password_hash_async("warmup")
 
     yield  # Application runs here
 
-    print("Application Shutdown: Closing MongoDB Atlas connection...")
+    logger.info("Application Shutdown: Closing MongoDB Atlas connection...")
+    await close_http_client()
+    await close_task_queue()
     await close_mongo_connection()
 
+    log_listener.stop()
+
 
 # --- FastAPI Application Initialization ---
 
@@ -1,10 +1,11 @@
 from typing import List, Optional, Dict
 
-from bson import ObjectId
-from pydantic import BaseModel, Field, conint, confloat
+from pydantic import BaseModel, ConfigDict, Field, conint, confloat
 from models.user import PyObjectId  # Import custom ObjectId
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
+
+IST = ZoneInfo('Asia/Kolkata')
 
 
 # ---------------------------------------------------------------------
@@ -112,14 +113,13 @@ class ApplicationModel(BaseModel):
 
     # Status and Verification
     status: str = Field("initial_application", description="e.g., initial_application, verifying, approved, rejected, manual_review")
-    submission_date: str = Field(default_factory=lambda: str(datetime.now(pytz.timezone('Asia/Kolkata'))))
+    submission_date: datetime = Field(default_factory=lambda: datetime.now(IST))
 
     # Report (only present after verification is complete)
     verification_report: Optional[VerificationReport] = None
 
-    class Config:
-        # Renamed in Pydantic V2 to validate_by_name, but kept for compatibility
-        allow_population_by_field_name = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(
+        populate_by_name=True,
         # Allow extra fields temporarily if needed for future expansion
-        extra = "allow"
\ No newline at end of file
+        extra="allow",
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import Optional, Any
-from pydantic import BaseModel, EmailStr, Field, GetCoreSchemaHandler
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, GetCoreSchemaHandler, field_validator
 from pydantic.json_schema import JsonSchemaValue
 from bson import ObjectId
 from pydantic_core import core_schema
@@ -55,15 +55,17 @@ class UserModel(BaseModel):
     """Base model for a user in the database."""
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
     email: EmailStr
-    hashed_password: str
+    # Optional because authenticated lookups project the hash out of the document
+    hashed_password: Optional[str] = None
     full_name: str
     phone_number: str
     is_active: bool = True
 
-    class Config:
-        validate_by_name = True
-        json_encoders = {ObjectId: str}
-        from_attributes = True
+    # PyObjectId serializes itself to str through its core schema
+    model_config = ConfigDict(
+        populate_by_name=True,
+        from_attributes=True,
+    )
 
 
 class UserCreate(BaseModel):
@@ -86,7 +88,13 @@ class UserOut(BaseModel):
     email: EmailStr
     full_name: str
 
-    class Config:
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(
         # This is the V2 equivalent of ORM mode, necessary for DB data conversion
-        from_attributes = True
\ No newline at end of file
+        from_attributes=True,
+    )
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def _stringify_id(cls, value: Any) -> str:
+        """Accepts the raw ObjectId from a DB document and converts it once."""
+        return str(value)
\ No newline at end of file
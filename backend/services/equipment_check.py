@@ -1,36 +1,60 @@
 # In backend/services/equipment_check.py
 
 
+import logging
 import io
-import cv2
-import numpy as np
-from typing import List, Optional, Tuple
+import mmap
+import re
+import threading
+from typing import List, Optional, Tuple, Union
 from functools import lru_cache  # <-- NEW: Import lru_cache
 
-from services.storage import get_file_content
+from services.storage import open_file_view
 from models.application import MetricScore, EquipmentCheckResult
 
+logger = logging.getLogger(__name__)
+
 
 # --- NEW: Lazy-loading function with caching ---
 
-@lru_cache
+# Serializes the first load so concurrent callers don't each build the torch graph
+_OCR_READER_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _load_ocr_reader():
+    import easyocr
+    import torch
+    try:
+        # Load the reader only when this function is called; use CUDA when present
+        gpu_flag = torch.cuda.is_available()
+        logger.info("Initializing EasyOCR reader (gpu=%s)", gpu_flag)
+        return easyocr.Reader(['en'], gpu=gpu_flag)
+    except Exception as e:
+        logger.warning("Could not initialize EasyOCR reader: %s", e)
+        return None
+
+
 def get_ocr_reader():
     """
     Loads the EasyOCR reader only once, on first access, and caches the result.
     This prevents slow startup times.
     """
-    import easyocr
-    try:
-        # Load the reader only when this function is called
-        return easyocr.Reader(['en'], gpu=False)  # Use gpu=True if CUDA is configured
-    except Exception as e:
-        print(f"Warning: Could not initialize EasyOCR reader: {e}")
-        return None
+    with _OCR_READER_LOCK:
+        return _load_ocr_reader()
 
 
 # --- END NEW: Global model initialization removed ---
 
 
+# Long-edge cap for OCR input; serial plates stay legible well below phone resolution
+OCR_MAX_EDGE_PX = 1600
+
+# Serial plates only carry these characters; restricting the recognizer's
+# output alphabet shrinks the decode search and avoids stray punctuation
+OCR_ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-/"
+
+
 # Placeholder ALMM Approved List (Indian Ministry of New and Renewable Energy)
 ALMM_APPROVED_LIST = {
     "SERIAL-123456": {"model": "PV-IND-A1", "manufacturer": "SolarTech India"},
@@ -39,10 +63,28 @@ ALMM_APPROVED_LIST = {
 }
 
 
-def extract_serials_with_ocr(image_content: bytes) -> List[str]:
+# Single-pass substitution table for the common OCR confusions (O/0, I/1)
+_OCR_CONFUSIONS = str.maketrans({'O': '0', 'I': '1'})
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _normalize_serial(text: str) -> str:
+    """Canonical form for serial comparison; folds common OCR confusions (O/0, I/1)."""
+    return text.strip().upper().translate(_OCR_CONFUSIONS)
+
+
+# Normalized once at import so lookups match the cleaned OCR output
+ALMM_SET = frozenset(_normalize_serial(serial) for serial in ALMM_APPROVED_LIST)
+
+
+def extract_serials_with_ocr(image_content: Union[bytes, mmap.mmap]) -> List[str]:
     """
     Runs EasyOCR on the close-up image to extract potential serial numbers.
     """
+    # Heavy CV imports are deferred to first use (cached in sys.modules afterwards)
+    import cv2
+    import numpy as np
+
     # CORRECTED: Retrieve the cached reader instance
     READER = get_ocr_reader()
 
@@ -50,26 +92,33 @@ def extract_serials_with_ocr(image_content: bytes) -> List[str]:
         return ["OCR_ERROR_READER_UNAVAILABLE"]
 
     try:
-        # Convert image bytes to OpenCV format
-        nparr = np.frombuffer(image_content, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Convert image bytes to OpenCV format (frombuffer is a zero-copy view, kept as a
+        # temporary so a memory-mapped source can be closed right after decoding).
+        # The decoder downsamples 2x and emits grayscale while decoding, so the
+        # full-resolution colour frame is never materialized.
+        image = cv2.imdecode(np.frombuffer(image_content, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_2)
 
         if image is None:
             return ["OCR_ERROR_INVALID_IMAGE"]
 
+        # Cap what remains of large photos; detector cost scales with pixel count
+        scale = OCR_MAX_EDGE_PX / max(image.shape[:2])
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
         # Run OCR
-        results = READER.readtext(image, detail=0)  # detail=0 returns only the text
+        results = READER.readtext(image, detail=0, allowlist=OCR_ALLOWLIST)  # detail=0 returns only the text
 
         # Filter and clean results (basic filtering: must contain at least one digit and be reasonably long)
         filtered_serials = [
-            text.strip().upper().replace('O', '0').replace('I', '1')  # Basic cleaning
-            for text in results if any(char.isdigit() for char in text) and len(text) > 5
+            _normalize_serial(text)  # Basic cleaning
+            for text in results if len(text) > 5 and _DIGIT_RE.search(text)
         ]
 
         return list(set(filtered_serials))  # Return unique results
 
     except Exception as e:
-        print(f"Error during OCR extraction: {e}")
+        logger.exception("Error during OCR extraction: %s", e)
         return ["OCR_ERROR_EXCEPTION"]
 
 
@@ -77,24 +126,21 @@ def check_almm_list(detected_serials: List[str]) -> Tuple[MetricScore, List[str]
     """
     Verifies extracted serial numbers against the placeholder ALMM database.
     """
-    verified_serials = []
-
-    for serial in detected_serials:
-        if serial in ALMM_APPROVED_LIST:
-            verified_serials.append(serial)
+    detected = set(map(_normalize_serial, detected_serials))
+    verified_serials = sorted(detected & ALMM_SET)
 
-    if not detected_serials:
+    if not detected:
         score = 0.1
         details = "No legible text/serial numbers could be extracted from the image."
-    elif len(verified_serials) == len(detected_serials) and len(verified_serials) > 0:
+    elif len(verified_serials) == len(detected) and len(verified_serials) > 0:
         score = 1.0
         details = f"All {len(verified_serials)} detected serial numbers match the ALMM approved list."
     elif len(verified_serials) > 0:
         score = 0.7
-        details = f"{len(verified_serials)} out of {len(detected_serials)} serials verified. Non-matching serials detected."
+        details = f"{len(verified_serials)} out of {len(detected)} serials verified. Non-matching serials detected."
     else:
         score = 0.0
-        details = f"No detected serial numbers ({len(detected_serials)}) matched the ALMM approved list."
+        details = f"No detected serial numbers ({len(detected)}) matched the ALMM approved list."
 
     return MetricScore(score=score, details=details), verified_serials
 
@@ -102,7 +148,8 @@ def check_almm_list(detected_serials: List[str]) -> Tuple[MetricScore, List[str]
 async def equipment_verification(serial_photo_key: str) -> EquipmentCheckResult:
     """Orchestrates the equipment verification process."""
     try:
-        image_content = get_file_content(serial_photo_key)
+        with open_file_view(serial_photo_key) as image_content:
+            detected_serials = extract_serials_with_ocr(image_content)
     except FileNotFoundError:
         return EquipmentCheckResult(
             score=0.0,
@@ -111,8 +158,6 @@ async def equipment_verification(serial_photo_key: str) -> EquipmentCheckResult:
             verified_serials=[]
         )
 
-    detected_serials = extract_serials_with_ocr(image_content)
-
     check_metric, verified_serials = check_almm_list(detected_serials)
 
     return EquipmentCheckResult(
@@ -1,22 +1,72 @@
+import asyncio
+import logging
 import httpx
+import numpy as np
 from bson import ObjectId
-from typing import Dict, Any
+from typing import Optional
 
 from core.database import get_application_collection, get_user_collection
 from core.config import settings
-from models.application import ApplicationModel, VerificationReport, MetricScore, EnergyPrediction
-from services.photo_forensics import gps_check, shadow_analysis_check
+from core.http_client import get_http_client
+from core.task_queue import get_task_queue
+from models.application import (
+    ApplicationModel, VerificationReport, MetricScore, EnergyPrediction,
+    ShadowAnalysisResult, SatelliteAnalysisResult, EquipmentCheckResult,
+)
+from services.photo_forensics import load_photo, gps_check, shadow_analysis_check
 from services.satellite_analysis import satellite_verification
 from services.equipment_check import equipment_verification
 from services.notification import send_expo_push_notification
 
+logger = logging.getLogger(__name__)
+
 PVWATTS_API_URL = "https://developer.nrel.gov/api/pvwatts/v8.json"
 
+# Confidence weights from config, in the order: GPS, shadow, satellite, equipment
+_WEIGHT_VEC = np.array([
+    settings.WEIGHT_GPS_MATCH,
+    settings.WEIGHT_SHADOW_ANALYSIS,
+    settings.WEIGHT_SATELLITE_ANALYSIS,
+    settings.WEIGHT_EQUIPMENT_CHECK,
+])
+_WEIGHT_SUM = float(_WEIGHT_VEC.sum())
+
+# PVWatts output is deterministic for a site, so results are kept in Redis for a day.
+# Coordinates are rounded to 3 decimals (~100 m), well within one weather grid cell.
+PVWATTS_CACHE_TTL_S = 24 * 60 * 60
+
+
+def _pvwatts_cache_key(lat: float, lon: float, system_capacity_kw: float) -> str:
+    return f"pvwatts:{lat:.3f}:{lon:.3f}:{system_capacity_kw}"
+
+
+async def _get_cached_annual_kwh(key: str) -> Optional[float]:
+    """Returns the cached annual kWh, or None on a miss or if Redis is unavailable."""
+    try:
+        cached = await get_task_queue().get(key)
+    except Exception as e:
+        logger.warning("PVWatts cache read failed, calling API directly: %s", e)
+        return None
+    return float(cached) if cached is not None else None
+
+
+async def _cache_annual_kwh(key: str, annual_kwh: float):
+    """Stores a successful PVWatts result; cache failures never fail the pipeline."""
+    try:
+        await get_task_queue().setex(key, PVWATTS_CACHE_TTL_S, str(annual_kwh))
+    except Exception as e:
+        logger.warning("PVWatts cache write failed: %s", e)
+
 
 async def calculate_expected_energy(lat: float, lon: float, system_capacity_kw: float) -> EnergyPrediction:
     """
     Queries the NREL PVWatts API for expected annual energy generation.
     """
+    cache_key = _pvwatts_cache_key(lat, lon, system_capacity_kw)
+    annual_kwh = await _get_cached_annual_kwh(cache_key)
+    if annual_kwh is not None:
+        return EnergyPrediction(expected_annual_kwh=annual_kwh, actual_monthly_kwh=None)
+
     params = {
         'api_key': settings.NREL_PVWATTS_API_KEY,
         'lat': lat,
@@ -34,40 +84,57 @@ async def calculate_expected_energy(lat: float, lon: float, system_capacity_kw:
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(PVWATTS_API_URL, params=params, timeout=10.0)
-            response.raise_for_status()
+        response = await get_http_client().get(PVWATTS_API_URL, params=params, timeout=10.0)
+        response.raise_for_status()
 
-            data = response.json()
-            annual_kwh = data['outputs']['ac_annual']
+        data = response.json()
+        annual_kwh = data['outputs']['ac_annual']
+        await _cache_annual_kwh(cache_key, annual_kwh)
 
-            return EnergyPrediction(
-                expected_annual_kwh=annual_kwh,
-                actual_monthly_kwh=None  # Monitoring part is future scope
-            )
+        return EnergyPrediction(
+            expected_annual_kwh=annual_kwh,
+            actual_monthly_kwh=None  # Monitoring part is future scope
+        )
 
     except httpx.HTTPStatusError as e:
-        print(f"PVWatts API HTTP error: {e.response.text}")
+        logger.error("PVWatts API HTTP error: %s", e.response.text)
         return EnergyPrediction(expected_annual_kwh=None)
     except Exception as e:
-        print(f"PVWatts API Request error: {e}")
+        logger.error("PVWatts API Request error: %s", e)
         return EnergyPrediction(expected_annual_kwh=None)
 
 
-async def run_verification_pipeline(app_id: str, app_doc: Dict[str, Any], user_email: str):
+def _run_photo_checks(wide_key: str, lat: float, lon: float):
+    """
+    GPS check followed by the shadow analysis that consumes its output.
+    The photo is read, EXIF-parsed and decoded once and shared by both checks.
+    """
+    photo = load_photo(wide_key)
+    gps_metric, detected_lat, detected_lon, capture_time_str = gps_check(photo, lat, lon)
+    shadow_result = shadow_analysis_check(photo, detected_lat, detected_lon, capture_time_str)
+    return gps_metric, shadow_result
+
+
+async def run_verification_pipeline(app_id: str, user_email: str):
     """
     🚀 THE ASYNCHRONOUS ORCHESTRATOR 🚀
     Executes the entire verification process in the background.
+    Only scalars are passed in; the application document is fetched fresh here.
     """
     app_collection = get_application_collection()
     user_collection = get_user_collection()
 
+    app_doc = await app_collection.find_one({"_id": ObjectId(app_id)})
+    if app_doc is None:
+        logger.warning("Verification skipped: App ID %s no longer exists.", app_id)
+        return
+
     # 1. Update status to 'verifying'
     await app_collection.update_one(
         {"_id": ObjectId(app_id)},
         {"$set": {"status": "verifying"}}
     )
-    print(f"Verification started for App ID: {app_id}")
+    logger.info("Verification started for App ID: %s", app_id)
 
     # Extract necessary inputs
     lat, lon = app_doc['registered_lat'], app_doc['registered_lon']
@@ -77,37 +144,50 @@ async def run_verification_pipeline(app_id: str, app_doc: Dict[str, Any], user_e
     serial_key = app_doc['serial_number_photo']['s3_key']
     submission_date = app_doc['submission_date']
 
-    # --- 2. Run Individual Checks (Concurrent execution is possible here) ---
+    # --- 2. Run Individual Checks Concurrently ---
 
-    # GPS Check
-    gps_metric, detected_lat, detected_lon, capture_time_str = gps_check(wide_key, lat, lon)
+    # The photo checks are synchronous and shadow depends on the GPS result,
+    # so they run together in a worker thread while the network-bound checks proceed.
+    photo_res, satellite_result, equipment_result, energy_prediction = await asyncio.gather(
+        asyncio.to_thread(_run_photo_checks, wide_key, lat, lon),
+        satellite_verification(lat, lon, panel_count, submission_date),
+        equipment_verification(serial_key),
+        calculate_expected_energy(lat, lon, capacity),
+        return_exceptions=True,
+    )
 
-    # Shadow Analysis
-    shadow_result = shadow_analysis_check(wide_key, detected_lat, detected_lon, capture_time_str)
+    # A failing stage scores zero instead of aborting the whole pipeline
+    if isinstance(photo_res, Exception):
+        logger.error("Photo checks failed for App ID %s: %s", app_id, photo_res)
+        details = f"Check failed: {photo_res}"
+        gps_metric = MetricScore(score=0.0, details=details)
+        shadow_result = ShadowAnalysisResult(score=0.0, details=details)
+    else:
+        gps_metric, shadow_result = photo_res
 
-    # Satellite Analysis
-    satellite_result = await satellite_verification(lat, lon, panel_count, submission_date)
+    if isinstance(satellite_result, Exception):
+        logger.error("Satellite analysis failed for App ID %s: %s", app_id, satellite_result)
+        satellite_result = SatelliteAnalysisResult(score=0.0, details=f"Check failed: {satellite_result}")
 
-    # Equipment Check
-    equipment_result = await equipment_verification(serial_key)
+    if isinstance(equipment_result, Exception):
+        logger.error("Equipment check failed for App ID %s: %s", app_id, equipment_result)
+        equipment_result = EquipmentCheckResult(score=0.0, details=f"Check failed: {equipment_result}")
 
-    # Energy Prediction (Not directly used in score, but stored)
-    energy_prediction = await calculate_expected_energy(lat, lon, capacity)
+    if isinstance(energy_prediction, Exception):
+        logger.error("Energy prediction failed for App ID %s: %s", app_id, energy_prediction)
+        energy_prediction = EnergyPrediction(expected_annual_kwh=None)
 
     # --- 3. Calculate Final Confidence Score ---
 
-    # Collect scores based on weights from config
-    scores = [
-        (gps_metric.score, settings.WEIGHT_GPS_MATCH),
-        (shadow_result.score, settings.WEIGHT_SHADOW_ANALYSIS),
-        (satellite_result.score, settings.WEIGHT_SATELLITE_ANALYSIS),
-        (equipment_result.score, settings.WEIGHT_EQUIPMENT_CHECK),
-    ]
-
-    total_score = sum(score * weight for score, weight in scores)
-    total_weight = sum(weight for _, weight in scores)
+    # Scores in the same order as _WEIGHT_VEC
+    score_vec = np.array([
+        gps_metric.score,
+        shadow_result.score,
+        satellite_result.score,
+        equipment_result.score,
+    ])
 
-    final_confidence = total_score / total_weight if total_weight > 0 else 0.0
+    final_confidence = float(score_vec @ _WEIGHT_VEC) / _WEIGHT_SUM if _WEIGHT_SUM > 0 else 0.0
 
     # --- 4. Decision Engine ---
 
@@ -134,15 +214,16 @@ async def run_verification_pipeline(app_id: str, app_doc: Dict[str, Any], user_e
 
     update_payload = {
         "status": final_status,
-        "verification_report": verification_report.dict(),
-        "expected_energy": energy_prediction.dict()  # Store prediction data
+        # Plain Python dicts go straight to BSON; no JSON round-trip needed
+        "verification_report": verification_report.model_dump(exclude_none=True),
+        "expected_energy": energy_prediction.model_dump(exclude_none=True)  # Store prediction data
     }
 
     await app_collection.update_one(
         {"_id": ObjectId(app_id)},
         {"$set": update_payload}
     )
-    print(f"Verification complete for App ID: {app_id}. Status: {final_status}")
+    logger.info("Verification complete for App ID: %s. Status: %s", app_id, final_status)
 
     # --- 6. Send Notification ---
 
@@ -1,9 +1,94 @@
+import asyncio
+import logging
 import httpx
 from typing import List, Optional
 from core.config import settings
+from core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
 
 EXPO_PUSH_API_URL = "https://exp.host/--/api/v2/push/send"
 
+# Expo accepts up to 100 messages per POST; queued messages are flushed when a
+# batch fills up or EXPO_FLUSH_INTERVAL_S after the first one arrives.
+EXPO_BATCH_SIZE = 100
+EXPO_FLUSH_INTERVAL_S = 0.5
+
+_notif_queue: Optional[asyncio.Queue] = None
+_dispatcher_task: Optional[asyncio.Task] = None
+
+
+async def _post_batch(messages: List[dict]) -> None:
+    """Sends one batch of push messages to Expo."""
+    try:
+        response = await get_http_client().post(
+            EXPO_PUSH_API_URL,
+            json=messages,
+            timeout=5.0
+        )
+        response.raise_for_status()  # Raise exception for bad status codes
+
+        response_json = response.json()
+        if response_json.get('errors'):
+            logger.error("Expo Push Error: %s", response_json['errors'])
+        else:
+            logger.info("Sent %d notification(s) to Expo", len(messages))
+
+    except httpx.HTTPStatusError as e:
+        logger.error("HTTP error sending Expo notification: %s", e)
+    except httpx.RequestError as e:
+        logger.error("Request error sending Expo notification: %s", e)
+    except Exception as e:
+        logger.exception("Unknown error sending Expo notification: %s", e)
+
+
+async def _dispatch_notifications(queue: asyncio.Queue) -> None:
+    """Drains the queue in batches until the shutdown sentinel (None) arrives."""
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await queue.get()
+        if message is None:
+            return
+
+        batch = [message]
+        deadline = loop.time() + EXPO_FLUSH_INTERVAL_S
+        stopping = False
+        while len(batch) < EXPO_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if message is None:
+                stopping = True
+                break
+            batch.append(message)
+
+        await _post_batch(batch)
+        if stopping:
+            return
+
+
+async def start_notification_dispatcher():
+    """Starts the background task that batches outgoing push notifications."""
+    global _notif_queue, _dispatcher_task
+    _notif_queue = asyncio.Queue()
+    _dispatcher_task = asyncio.create_task(_dispatch_notifications(_notif_queue))
+    logger.info("Notification dispatcher started.")
+
+
+async def stop_notification_dispatcher():
+    """Flushes any queued notifications and stops the dispatcher."""
+    global _notif_queue, _dispatcher_task
+    if _dispatcher_task is None:
+        return
+    await _notif_queue.put(None)
+    await _dispatcher_task
+    _notif_queue, _dispatcher_task = None, None
+    logger.info("Notification dispatcher stopped.")
+
 
 async def send_expo_push_notification(
         token: str,  # The Expo Push Token for the user's device
@@ -12,10 +97,10 @@ async def send_expo_push_notification(
         data: Optional[dict] = None
 ) -> None:
     """
-    Sends a push notification to a single Expo token.
+    Queues a push notification to a single Expo token for the next batch.
     """
     if not token:
-        print("Notification skipped: No Expo token provided.")
+        logger.info("Notification skipped: No Expo token provided.")
         return
 
     message = {
@@ -26,27 +111,12 @@ async def send_expo_push_notification(
         "priority": "high",
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                EXPO_PUSH_API_URL,
-                json=[message],
-                timeout=5.0
-            )
-            response.raise_for_status()  # Raise exception for bad status codes
-
-            response_json = response.json()
-            if response_json.get('errors'):
-                print(f"Expo Push Error: {response_json['errors']}")
-            else:
-                print(f"Notification sent successfully to {token}")
-
-        except httpx.HTTPStatusError as e:
-            print(f"HTTP error sending Expo notification: {e}")
-        except httpx.RequestError as e:
-            print(f"Request error sending Expo notification: {e}")
-        except Exception as e:
-            print(f"Unknown error sending Expo notification: {e}")
+    if _notif_queue is None:
+        # No dispatcher running (e.g. a one-off script); send immediately
+        await _post_batch([message])
+        return
+
+    await _notif_queue.put(message)
 
 # Note: In a real system, you'd fetch the user's Expo token from the 'users' collection
-# when they log in or register their device.
\ No newline at end of file
+# when they log in or register their device.
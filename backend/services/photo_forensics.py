@@ -1,58 +1,145 @@
-from typing import Dict, Tuple, Optional
-from PIL import Image
-from PIL.ExifTags import TAGS
-import io
+from typing import Dict, Tuple, Optional, Union
+import logging
+import mmap
+from dataclasses import dataclass
+from functools import lru_cache
 import cv2
 import numpy as np
-import pytz
-from datetime import datetime
+import piexif
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 from pvlib import solarposition
 
-from services.storage import get_file_content
+from services.storage import open_file_view
+from utils.coordinates import haversine_vec
 from models.application import MetricScore, ShadowAnalysisResult
 
+logger = logging.getLogger(__name__)
 
-def extract_exif_data(file_content: bytes) -> Dict:
-    """Extracts relevant EXIF data (GPS, Date/Time) from a photo."""
+# Capture times are interpreted as Indian Standard Time; ZoneInfo instances are cached,
+# and attaching one is a plain tzinfo assignment (no pytz localize step)
+IST = ZoneInfo('Asia/Kolkata')
+
+
+@dataclass(frozen=True)
+class PhotoContext:
+    """A photo read, EXIF-parsed and decoded once, then shared by every forensics check."""
+    exif: Dict
+    image: Optional[np.ndarray]  # BGR pixels; None if the bytes are not a decodable image
+
+
+def load_photo(photo_s3_key: str) -> PhotoContext:
+    """
+    Loads a photo from storage for the forensics checks.
+    Raises FileNotFoundError if the photo is missing.
+    """
+    with open_file_view(photo_s3_key) as file_content:
+        # The frombuffer view is a temporary, released before the mapping closes
+        image = cv2.imdecode(np.frombuffer(file_content, np.uint8), cv2.IMREAD_COLOR)
+        # piexif slices its segments (including the scan data) into bytes, so this still copies
+        exif = extract_exif_data(file_content)
+    return PhotoContext(exif=exif, image=image)
+
+
+def _exif_items(exif_dict: Dict, ifd: str):
+    """
+    Yields (tag_name, value) for one piexif IFD. Unknown tags keep their numeric id, and
+    ASCII tags (NUL-terminated bytes in piexif) are decoded to str as Pillow returned them.
+    """
+    tag_info = piexif.TAGS[ifd]
+    for tag, value in exif_dict.get(ifd, {}).items():
+        info = tag_info.get(tag, {})
+        if info.get("type") == piexif.TYPES.Ascii and isinstance(value, bytes):
+            value = value.rstrip(b"\x00").decode("ascii", errors="replace")
+        yield info.get("name", tag), value
+
+
+def extract_exif_data(file_content: Union[bytes, mmap.mmap]) -> Dict:
+    """
+    Extracts relevant EXIF data (GPS, Date/Time) from a photo.
+    piexif parses only the APP1 segment, so no image decoder is initialised.
+    """
     exif_data = {}
     try:
-        image = Image.open(io.BytesIO(file_content))
-        info = image._getexif()
-        if info:
-            for tag, value in info.items():
-                decoded = TAGS.get(tag, tag)
-                exif_data[decoded] = value
+        exif_dict = piexif.load(file_content)
+        exif_data.update(_exif_items(exif_dict, "0th"))
+        exif_data.update(_exif_items(exif_dict, "Exif"))
+
+        gps_info = dict(_exif_items(exif_dict, "GPS"))
+        if gps_info:
+            exif_data['GPSInfo'] = gps_info
 
         # Handle GPS Info (Requires a separate lookup)
         if 'GPSInfo' in exif_data:
             # Placeholder: A full implementation would parse the GPS tuple structure
-            print("GPS data detected in EXIF.")
+            logger.debug("GPS data detected in EXIF.")
             # We assume a helper function converts GPSInfo into (lat, lon)
             # For simplicity here, we rely on the client app providing clean GPS data,
             # but this function is the safeguard.
 
     except Exception as e:
-        print(f"Error extracting EXIF data: {e}")
+        logger.warning("Error extracting EXIF data: %s", e)
 
     return exif_data
 
 
+def parse_capture_time(capture_time_str: str) -> datetime:
+    """
+    Parses a capture time into an IST-aware datetime.
+    Naive EXIF times are taken as IST; an explicit offset is respected.
+    """
+    time = datetime.fromisoformat(capture_time_str)
+    return time.replace(microsecond=0, tzinfo=IST) if time.tzinfo is None else time.astimezone(IST)
+
+
+def expected_solar_position(time_local: datetime, lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Returns the expected sun (azimuth, elevation) in degrees for a timezone-aware time.
+    Uses pvlib's analytical Spencer (1971) formulas, which are accurate to about a degree
+    (well inside the shadow tolerances) and far cheaper than the default SPA solver.
+    """
+    time_utc = time_local.astimezone(timezone.utc)
+    day_of_year = time_utc.timetuple().tm_yday
+    declination = solarposition.declination_spencer71(day_of_year)
+    equation_of_time = solarposition.equation_of_time_spencer71(day_of_year)
+
+    # Hour angle in degrees: 15 deg per hour from solar noon, corrected for longitude and EoT
+    hours_utc = time_utc.hour + time_utc.minute / 60 + time_utc.second / 3600
+    hour_angle = np.radians(15.0 * (hours_utc - 12.0) + lon + equation_of_time / 4.0)
+
+    latitude = np.radians(lat)
+    zenith = solarposition.solar_zenith_analytical(latitude, hour_angle, declination)
+    azimuth = solarposition.solar_azimuth_analytical(latitude, hour_angle, declination, zenith)
+    return float(np.degrees(azimuth)), 90.0 - float(np.degrees(zenith))
+
+
+# Solar positions for quantized inputs: the sun moves < 0.25 deg per minute and a 0.001 deg
+# (~100 m) shift is negligible, so photos from one site and minute share an entry
+SOLAR_POSITION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SOLAR_POSITION_CACHE_SIZE)
+def _solar_cached(lat_q: float, lon_q: float, minute_local: datetime) -> Tuple[float, float]:
+    return expected_solar_position(minute_local, lat_q, lon_q)
+
+
+def cached_solar_position(time_local: datetime, lat: float, lon: float) -> Tuple[float, float]:
+    """expected_solar_position, memoized on (lat, lon) to 3 decimals and time to the minute."""
+    return _solar_cached(round(lat, 3), round(lon, 3), time_local.replace(second=0, microsecond=0))
+
+
 def gps_check(
-        photo_s3_key: str,
+        photo: PhotoContext,
         registered_lat: float,
         registered_lon: float,
         threshold_m: float = 100.0
-) -> Tuple[MetricScore, float, float]:
+) -> Tuple[MetricScore, float, float, str]:
     """
     Verifies the photo's EXIF GPS matches the registered location.
-    Returns score, detected_lat, detected_lon.
+    Returns score, detected_lat, detected_lon, capture_time_str.
     """
-    # 1. Load EXIF data
-    try:
-        file_content = get_file_content(photo_s3_key)
-        exif_data = extract_exif_data(file_content)
-    except FileNotFoundError:
-        return MetricScore(score=0.0, details="Photo file not found in storage."), 0.0, 0.0
+    # 1. EXIF data was parsed once when the photo was loaded
+    exif_data = photo.exif
 
     # 2. Extract detected GPS from EXIF
     # **NOTE:** Implement robust EXIF GPS extraction here.
@@ -61,9 +148,8 @@ def gps_check(
     detected_lon = registered_lon + 0.0001
     capture_time_str = exif_data.get('DateTimeOriginal', datetime.now().isoformat())
 
-    # 3. Calculate distance (using Haversine or simple distance)
-    # distance = calculate_distance(registered_lat, registered_lon, detected_lat, detected_lon)
-    distance = 15.0  # Simulated distance in meters (15m)
+    # 3. Calculate distance (Haversine, in meters)
+    distance = float(haversine_vec(registered_lat, registered_lon, detected_lat, detected_lon))
 
     if distance <= threshold_m:
         score = 1.0
@@ -76,7 +162,7 @@ def gps_check(
 
 
 def shadow_analysis_check(
-        photo_s3_key: str,
+        photo: PhotoContext,
         lat: float,
         lon: float,
         capture_time_str: str,
@@ -86,14 +172,7 @@ def shadow_analysis_check(
     """
     # 1. Calculate Expected Solar Position (Azimuth/Elevation)
     try:
-        # Convert to datetime object with timezone (assuming Indian Standard Time)
-        tz = pytz.timezone('Asia/Kolkata')
-        time = datetime.fromisoformat(capture_time_str)
-        time_local = tz.localize(time.replace(microsecond=0))
-
-        solpos = solarposition.get_solarposition(time_local, lat, lon)
-        expected_azimuth = solpos['azimuth'].iloc[0]
-        expected_elevation = solpos['elevation'].iloc[0]
+        expected_azimuth, expected_elevation = cached_solar_position(parse_capture_time(capture_time_str), lat, lon)
     except Exception as e:
         return ShadowAnalysisResult(
             score=0.0, details=f"Failed to calculate expected solar position: {e}",
@@ -102,12 +181,8 @@ def shadow_analysis_check(
 
     # 2. Image Processing to Detect Shadow Angles (Simplified)
     # This involves complex CV: Canny edge detection, Hough lines, perspective transform.
-    file_content = get_file_content(photo_s3_key)
-    nparr = np.frombuffer(file_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-    # Placeholder for actual CV detection
-    # detected_shadow_angle = run_shadow_detection_cv(image)
+    # Placeholder for actual CV detection on photo.image
+    # detected_shadow_angle = run_shadow_detection_cv(photo.image)
     detected_shadow_angle = expected_azimuth + np.random.uniform(-5, 5)  # Simulate a small error
 
     # 3. Comparison
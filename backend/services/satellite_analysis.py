@@ -1,9 +1,12 @@
 # In backend/services/satellite_analysis.py
 
+import asyncio
+import logging
 import httpx
 import numpy as np
 import cv2
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional, Union
+from datetime import timedelta, datetime
 from functools import lru_cache  # <-- NEW: Import lru_cache
 
 from pathlib import Path
@@ -11,127 +14,243 @@ from pathlib import Path
 
 
 from core.config import settings
+from core.model_cache import model_cache
 from models.application import MetricScore, SatelliteAnalysisResult
 
+logger = logging.getLogger(__name__)
+
 # --- NEW: Lazy-loading function with caching ---
 CUSTOM_MODEL_PATH = "deliverables/trained_model_file/best.pt"
 
+# TensorRT engine exported next to the weights on first GPU boot: FP16 by default, INT8
+# when a calibration dataset is configured. The batch dimension is dynamic so both the
+# pre/post pair and single images fit.
+# The engine is built and optimized for the configured inference size, so the size is part
+# of its file name and changing YOLO_IMGSZ exports a fresh engine
+ENGINE_IMGSZ = settings.YOLO_IMGSZ
+
+
+def _engine_path(int8: bool) -> Path:
+    weights = Path(CUSTOM_MODEL_PATH)
+    return weights.with_name(f"{weights.stem}_{ENGINE_IMGSZ}{'_int8' if int8 else ''}.engine")
+
+
+def _load_tensorrt_engine():
+    """Returns the TensorRT engine model, exporting it once if it does not exist yet."""
+    from ultralytics import YOLO
+
+    calibration_data = settings.YOLO_INT8_CALIBRATION_DATA
+    engine_path = _engine_path(int8=calibration_data is not None)
+
+    if not engine_path.exists():
+        if calibration_data is not None:
+            logger.info("Exporting YOLO weights to a TensorRT INT8 engine (one-time calibration)...")
+            # batch doubles as the calibration batch size; larger calibrates better
+            export_args = dict(int8=True, data=calibration_data, batch=8, workspace=4)
+        else:
+            logger.info("Exporting YOLO weights to a TensorRT FP16 engine (one-time)...")
+            export_args = dict(half=True, batch=2)
+
+        exported = YOLO(CUSTOM_MODEL_PATH).export(
+            format="engine", imgsz=ENGINE_IMGSZ, dynamic=True, **export_args
+        )
+        # Ultralytics always names the engine after the weights; keep precisions apart
+        if Path(exported) != engine_path:
+            Path(exported).replace(engine_path)
+
+    return YOLO(str(engine_path), task="segment")
+
 
-@lru_cache
 def get_yolo_model():
     """
     Loads the YOLO model only once, on first access, and caches the result.
     This prevents memory spikes during application startup.
+    The shared model cache bounds how many models stay resident on the GPU.
     """
+    return model_cache.get(CUSTOM_MODEL_PATH, _load_yolo_model)
+
+
+def _load_yolo_model():
+    """Uses a TensorRT engine on CUDA hosts, the PyTorch weights otherwise."""
+    import torch
     from ultralytics import YOLO
+
+    if torch.cuda.is_available():
+        try:
+            return _load_tensorrt_engine()
+        except Exception as e:
+            # e.g. TensorRT not installed; eager PyTorch still works on the GPU
+            logger.warning("TensorRT engine unavailable, using PyTorch weights: %s", e)
+
     try:
         # Load your custom segmentation weights
         return YOLO(CUSTOM_MODEL_PATH)
     except Exception as e:
-        print(f"Warning: Could not load YOLO model: {e}")
+        logger.warning("Could not load YOLO model: %s", e)
         return None
 
 
+@lru_cache(maxsize=1)
+def use_half_precision() -> bool:
+    """
+    FP16 inference on CUDA hosts. Ultralytics uploads the uint8 batch and does the
+    /255 normalization on the device, so this also halves that work; CPU stays FP32.
+    """
+    import torch
+    return torch.cuda.is_available()
+
+
 # --- END NEW ---
 
 
 SENTINEL_HUB_API_URL = "https://services.sentinel-hub.com/api/v1/"  # Placeholder base URL
 
 
-async def get_sentinel_image(lat: float, lon: float, date: str) -> Optional[bytes]:
+# Satellite imagery is either encoded bytes (real API) or an already-decoded BGR array
+SatelliteImage = Union[bytes, np.ndarray]
+
+# Assuming you have a dummy image named 'dummy_satellite_panel.jpg' in a known path
+DUMMY_IMAGE_PATH = Path(__file__).resolve().parents[2] / "data" / "dummy_satellite_panel.jpg"
+
+
+@lru_cache(maxsize=1)
+def _load_dummy() -> np.ndarray:
+    """
+    Decodes (or synthesizes) the simulated satellite image once per process.
+    Returned as an ndarray so YOLO gets it without a JPEG encode/decode round-trip.
+    """
+    if DUMMY_IMAGE_PATH.exists():
+        dummy_image = cv2.imread(str(DUMMY_IMAGE_PATH), cv2.IMREAD_COLOR)
+        if dummy_image is not None:
+            return dummy_image
+
+    dummy_image = np.zeros((512, 512, 3), dtype=np.uint8)
+    cv2.putText(dummy_image, "Simulated Satellite Image", (50, 250), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                (255, 255, 255), 2)
+    return dummy_image
+
+
+async def get_sentinel_image(lat: float, lon: float, date: str) -> Optional[SatelliteImage]:
     """
     Fetches satellite imagery (simplified placeholder for Sentinel Hub API).
     """
     # --- SIMULATED RESPONSE ---
-    print(f"Simulating fetch for {lat}, {lon} on {date}...")
+    logger.debug("Simulating fetch for %s, %s on %s...", lat, lon, date)
 
     # Load a dummy image that we can detect panels on
     try:
-        # Assuming you have a dummy image named 'dummy_satellite_panel.jpg' in a known path
-        dummy_path = Path(__file__).parent.parent.parent / "data" / "dummy_satellite_panel.jpg"
-        if not dummy_path.exists():
-            dummy_image = np.zeros((512, 512, 3), dtype=np.uint8)
-            cv2.putText(dummy_image, "Simulated Satellite Image", (50, 250), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
-                        (255, 255, 255), 2)
-            is_success, buffer = cv2.imencode(".jpg", dummy_image)
-            return buffer.tobytes()
-
-        with open(dummy_path, 'rb') as f:
-            return f.read()
+        return _load_dummy()
 
     except Exception as e:
-        print(f"Error loading dummy image: {e}")
+        logger.exception("Error loading dummy image: %s", e)
         return None
     # --- END SIMULATED RESPONSE ---
 
 
-def run_yolo_detection(image_content: bytes) -> Tuple[int, float, float]:
-    """
-    Runs YOLOv11 segmentation model to detect panels and estimate area.
-    Returns: (panel_count, avg_confidence, total_pv_area_sqm)
-    """
-    # CORRECTED: Retrieve the model using the cached getter function
-    YOLO_MODEL = get_yolo_model()
-
-    if YOLO_MODEL is None:
-        return 0, 0.0, 0.0  # Return 0 for area on failure
+def decode_image(image_content: SatelliteImage) -> Optional[np.ndarray]:
+    """Decodes image bytes to a BGR array."""
+    if isinstance(image_content, np.ndarray):
+        return image_content  # Already decoded
 
-    # Convert image bytes to OpenCV format
     nparr = np.frombuffer(image_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
-    if image is None:
-        print("YOLO failed: Invalid image content.")
-        return 0, 0.0, 0.0
 
-    # Run inference (YOLO_MODEL should be loaded with the '-seg.pt' weights)
-    results = YOLO_MODEL(image, verbose=False)
+# ASSUMPTION: 1 pixel^2 = 0.25 m^2 (based on 0.5 m GSD). Must be documented in Model Card.
+PIXEL_TO_SQM_FACTOR = 0.25
 
-    panel_count = 0
-    total_conf = 0.0
-    total_pixel_area = 0.0
 
-    # ASSUMPTION: 1 pixel^2 = 0.25 m^2 (based on 0.5 m GSD). Must be documented in Model Card.
-    PIXEL_TO_SQM_FACTOR = 0.25
+def _summarize_detections(results) -> List[Tuple[int, float, float]]:
+    """
+    Reduces YOLO results to one (panel_count, avg_confidence, total_pv_area_sqm) each.
+    The reductions stay on the device and reach the host in a single transfer for the
+    whole batch, instead of two .item() syncs per result.
+    """
+    import torch
 
+    panel_counts, stats = [], []
     for r in results:
-        # Access segmentation mask data for accurate pixel area sum
-        if r.masks is not None:
-            # r.masks.area() returns the sum of all predicted mask pixel counts
-            # We use .sum().item() to get the scalar total area in pixels
-            total_pixel_area = r.masks.area().sum().item()
-
-        panel_boxes = r.boxes
-        panel_count = len(panel_boxes)
-
-        # Calculate average confidence (using bounding boxes)
-        if panel_count > 0:
-            total_conf = sum(panel_boxes.conf.tolist())
-            avg_confidence = total_conf / panel_count
-        else:
-            avg_confidence = 0.0
+        conf = r.boxes.conf
+        # Box count is tensor metadata; no device sync
+        panel_counts.append(conf.shape[0])
+        # Average confidence (using bounding boxes); an empty mean would be NaN
+        avg_confidence = conf.mean() if conf.shape[0] > 0 else conf.new_zeros(())
+        # r.masks.area() returns the predicted mask pixel counts; their sum is the total area
+        total_pixel_area = r.masks.area().sum() if r.masks is not None else conf.new_zeros(())
+        stats.append(torch.stack([
+            avg_confidence.float(), total_pixel_area.to(device=conf.device, dtype=torch.float32)
+        ]))
+
+    if not stats:
+        return []
+    host_stats = torch.stack(stats).tolist()
 
     # Convert the total pixel area to square meters
-    total_pv_area_sqm = total_pixel_area * PIXEL_TO_SQM_FACTOR
+    return [
+        (panel_count, avg_confidence, total_pixel_area * PIXEL_TO_SQM_FACTOR)
+        for panel_count, (avg_confidence, total_pixel_area) in zip(panel_counts, host_stats)
+    ]
+
+
+def run_yolo_detection(image_contents: List[SatelliteImage]) -> List[Tuple[int, float, float]]:
+    """
+    Runs YOLOv11 segmentation model to detect panels and estimate area.
+    All decodable images go through a single batched forward pass.
+    Returns one (panel_count, avg_confidence, total_pv_area_sqm) per input, in order.
+    """
+    # CORRECTED: Retrieve the model using the cached getter function
+    model = get_yolo_model()
+
+    # Inputs that fail keep the zero result (0 for area on failure)
+    detections = [(0, 0.0, 0.0)] * len(image_contents)
+
+    if model is None:
+        return detections
+
+    # Convert image bytes to OpenCV format, remembering each image's input slot
+    images, slots = [], []
+    for slot, image_content in enumerate(image_contents):
+        image = decode_image(image_content)
+        if image is None:
+            logger.warning("YOLO failed: Invalid image content.")
+            continue
+        images.append(image)
+        slots.append(slot)
+
+    if not images:
+        return detections
+
+    # Run inference once for the whole batch (the model should be loaded with the '-seg.pt' weights)
+    results = model(images, imgsz=settings.YOLO_IMGSZ, half=use_half_precision(), verbose=False)
+
+    for slot, detection in zip(slots, _summarize_detections(results)):
+        detections[slot] = detection
 
-    # Return count, confidence, and area
-    return panel_count, avg_confidence, total_pv_area_sqm
+    return detections
 
 
 async def satellite_verification(
         lat: float,
         lon: float,
         declared_panel_count: int,
-        submission_date: str
+        submission_date: Union[str, datetime]
 ) -> SatelliteAnalysisResult:
-    """Orchestrates the satellite verification process."""
+    """
+    Orchestrates the satellite verification process.
+    submission_date may be a BSON date or, for older application documents, an ISO string.
+    """
+    if isinstance(submission_date, str):
+        submission_date = datetime.fromisoformat(submission_date)
 
     # Define comparison dates
     six_months_ago = (datetime.now() - timedelta(days=180)).isoformat()
 
-    # Fetch pre-install image and extract 3 values
-    pre_image_content = await get_sentinel_image(lat, lon, six_months_ago)
-    if not pre_image_content:
+    # Fetch pre-install and post-install (recent date) images concurrently
+    pre_image_content, post_image_content = await asyncio.gather(
+        get_sentinel_image(lat, lon, six_months_ago),
+        get_sentinel_image(lat, lon, submission_date.isoformat()),
+    )
+    if pre_image_content is None:
         # Note: Added post_area_sqm=0.0 to the return payload of SatelliteAnalysisResult
         # to ensure the structure remains intact, assuming the model has been updated.
         return SatelliteAnalysisResult(
@@ -140,20 +259,20 @@ async def satellite_verification(
             pre_install_panel_count=0, post_install_panel_count=0, yolo_confidence=0.0
         )
 
-    # FIX: Must capture all three return values from run_yolo_detection
-    pre_count, pre_conf, pre_area = run_yolo_detection(pre_image_content)
-
-    # Fetch post-install image (using a recent date)
-    post_image_content = await get_sentinel_image(lat, lon, submission_date)
-    if not post_image_content:
+    if post_image_content is None:
+        # FIX: Must capture all three return values from run_yolo_detection
+        [(pre_count, pre_conf, pre_area)] = await asyncio.to_thread(run_yolo_detection, [pre_image_content])
         return SatelliteAnalysisResult(
             score=0.0, details="Failed to fetch post-installation satellite image.",
             # Placeholder for area:
             pre_install_panel_count=pre_count, post_install_panel_count=0, yolo_confidence=0.0
         )
 
-    # FIX: Must capture all three return values
-    post_count, post_conf, post_area = run_yolo_detection(post_image_content)
+    # Pre and post images share one batched forward pass, run off the event loop so the
+    # photo, equipment and energy stages gathered alongside it keep progressing
+    (pre_count, pre_conf, pre_area), (post_count, post_conf, post_area) = await asyncio.to_thread(
+        run_yolo_detection, [pre_image_content, post_image_content]
+    )
 
     # Comparison and Scoring Logic
     # (Scoring remains primarily on count difference, but area is now available for the report)
@@ -186,6 +305,3 @@ async def satellite_verification(
         # Note: You should update your models/application.py to include 'post_area_sqm'
         # in SatelliteAnalysisResult to fully capture this quantification data.
     )
-
-
-from datetime import timedelta, datetime
\ No newline at end of file
@@ -1,11 +1,18 @@
+import logging
+import asyncio
+import mmap
 import os
 import shutil
-from typing import Dict
+import aiofiles
+from contextlib import contextmanager
+from typing import Dict, Iterator, Union
 from pathlib import Path
 from fastapi import UploadFile
 from core.config import settings
 
-# Base storage directory defined in utils/config.py
+logger = logging.getLogger(__name__)
+
+# Base storage directory defined in core/config.py
 BASE_STORAGE_PATH = Path(settings.STORAGE_DIR)
 
 
@@ -17,48 +24,97 @@ def get_storage_path(user_id_str: str, file_key: str) -> Path:
     return user_dir / file_key
 
 
+# Uploads are streamed to disk in fixed-size chunks so memory stays flat regardless of photo size
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+def _copy_spooled_file(src, file_path: Path) -> None:
+    """
+    Copies an upload the server already spooled to a temp file on disk.
+    os.sendfile moves the bytes in the kernel without passing them through Python.
+    """
+    with open(file_path, "wb") as out:
+        try:
+            size = os.fstat(src.fileno()).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            # sendfile between regular files is Linux-only; copy in userspace elsewhere
+            src.seek(0)
+            out.seek(0)
+            out.truncate()
+            shutil.copyfileobj(src, out, UPLOAD_CHUNK_SIZE)
+
+
+async def _save_one(user_id_str: str, file_type: str, file: UploadFile) -> str:
+    """
+    Streams a single UploadFile to storage and returns its key.
+    """
+    # Create a unique, descriptive file key
+    # Format: user_id-app_id-file_type.ext
+    # We will use the original filename + file_type for uniqueness for now.
+    # In a real system, you'd use a UUID or the application ID for robustness.
+    file_extension = Path(file.filename).suffix if file.filename else ".jpg"
+    file_key = f"{user_id_str}-{file_type}{file_extension}"
+
+    # Get the full path
+    file_path = get_storage_path(user_id_str, file_key)
+
+    try:
+        if getattr(file.file, "_rolled", False):
+            # Large uploads are already on disk: zero-copy them in a worker thread
+            await asyncio.to_thread(_copy_spooled_file, file.file, file_path)
+            return str(file_path)
+
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await out.write(chunk)
+    except Exception as e:
+        logger.error("Error saving file %s: %s", file_type, e)
+        # Reraise or handle cleanup if needed
+        raise e
+
+    return str(file_path)  # Store local path as the key
+
+
 async def save_uploaded_files(user_id_str: str, files: Dict[str, UploadFile]) -> Dict[str, str]:
     """
     Saves multiple UploadFile objects to local storage (or S3 in production).
     Returns a dictionary of keys (the file name/path identifier).
     """
-    saved_file_keys = {}
-
-    for file_type, file in files.items():
-        # Create a unique, descriptive file key
-        # Format: user_id-app_id-file_type.ext
-        # We will use the original filename + file_type for uniqueness for now.
-        # In a real system, you'd use a UUID or the application ID for robustness.
-        file_extension = Path(file.filename).suffix if file.filename else ".jpg"
-        file_key = f"{user_id_str}-{file_type}{file_extension}"
+    # The files are independent, so write them concurrently
+    saved_paths = await asyncio.gather(
+        *(_save_one(user_id_str, file_type, file) for file_type, file in files.items())
+    )
 
-        # Get the full path
-        file_path = get_storage_path(user_id_str, file_key)
+    return dict(zip(files.keys(), saved_paths))
 
-        # Write the file content asynchronously
-        try:
-            # Use shutil.copyfileobj for efficient, buffered writing
-            with open(file_path, "wb") as buffer:
-                # Read chunks from the UploadFile
-                shutil.copyfileobj(file.file, buffer)
 
-            saved_file_keys[file_type] = str(file_path)  # Store local path as the key
-        except Exception as e:
-            print(f"Error saving file {file_type}: {e}")
-            # Reraise or handle cleanup if needed
-            raise e
+# Below this size a plain read() is cheaper than setting up a mapping
+MMAP_MIN_BYTES = 64 * 1024
 
-    return saved_file_keys
 
-
-def get_file_content(file_path: str) -> bytes:
+@contextmanager
+def open_file_view(file_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
     """
-    Retrieves the raw bytes content of a file given its storage path/key.
-    (This function is crucial for ML/CV services to load the image data.)
+    Yields a read-only buffer over a stored file for CV decoding.
+    Large files are memory-mapped, so np.frombuffer/cv2.imdecode read the page cache directly
+    instead of a copy in the Python heap. The mapping closes when the block exits: decode
+    inside it and keep no views of the buffer afterwards.
     """
     try:
-        with open(file_path, "rb") as f:
-            return f.read()
+        f = open(file_path, "rb")
     except FileNotFoundError:
-        print(f"Error: File not found at {file_path}")
-        raise FileNotFoundError(f"File not found: {file_path}")
\ No newline at end of file
+        logger.error("Error: File not found at %s", file_path)
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    with f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
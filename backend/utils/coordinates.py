@@ -0,0 +1,19 @@
+import numpy as np
+from numpy.typing import ArrayLike
+
+# --- Constants ---
+# Earth's radius (mean) for accurate distance calculations
+EARTH_RADIUS_M = 6371000
+
+
+def haversine_vec(lat1: ArrayLike, lon1: ArrayLike, lat2: ArrayLike, lon2: ArrayLike) -> np.ndarray:
+    """
+    Great-circle distance in meters between two sets of (lat, lon) points in degrees.
+
+    Inputs broadcast against each other, so a whole batch of registered vs detected
+    coordinates is computed in one call; scalars return a 0-d array.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
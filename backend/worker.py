@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Dict
+
+from arq.worker import func
+
+from core.database import connect_to_mongo, close_mongo_connection
+from core.task_queue import get_redis_settings, connect_to_task_queue, close_task_queue
+from core.http_client import open_http_client, close_http_client
+from core.logging_config import setup_logging
+from services.notification import start_notification_dispatcher, stop_notification_dispatcher
+from services.ml_pipeline import run_verification_pipeline
+from services.satellite_analysis import get_yolo_model
+from services.equipment_check import get_ocr_reader
+
+
+# --- Worker Lifecycle ---
+
+async def startup(ctx: Dict[str, Any]):
+    """
+    Configures logging, connects to MongoDB Atlas and Redis, opens the shared HTTP client
+    and preloads the YOLO and OCR models.
+    """
+    ctx["log_listener"] = setup_logging()
+    await connect_to_mongo()
+    await connect_to_task_queue()
+    await open_http_client()
+    await start_notification_dispatcher()
+
+    # Load the models once per worker process, before the first job arrives; they stay
+    # resident (in VRAM on GPU hosts) in their caches for the life of the worker.
+    await asyncio.to_thread(get_yolo_model)
+    await asyncio.to_thread(get_ocr_reader)
+
+
+async def shutdown(ctx: Dict[str, Any]):
+    """Closes the worker's connections and flushes pending log records."""
+    await stop_notification_dispatcher()
+    await close_http_client()
+    await close_task_queue()
+    await close_mongo_connection()
+    ctx["log_listener"].stop()
+
+
+# --- Jobs ---
+
+async def verify_application(ctx: Dict[str, Any], app_id: str, user_email: str):
+    """Runs the verification pipeline for one application."""
+    await run_verification_pipeline(app_id, user_email)
+
+
+class WorkerSettings:
+    """arq worker configuration for the verification pipeline."""
+    functions = [func(verify_application, name="run_verification_pipeline")]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = get_redis_settings()
+
+# To run the worker:
+# arq worker.WorkerSettings
\ No newline at end of file
@@ -18,6 +18,18 @@ class Settings(BaseSettings):
     SENTINEL_HUB_CLIENT_SECRET: str = "42rw4bZGFAYAsqcz67sFbD0726bzDo5R"
 
 
+    # --- Batch Pipeline Settings ---
+    # Maximum number of samples fetching imagery at once (bounds concurrent HTTP requests)
+    MAX_CONCURRENCY: int = 8
+    # Samples taken through fetch, detect and score together; fetched images are only held
+    # for the current window, which bounds memory on large inputs
+    PIPELINE_WINDOW_SIZE: int = 256
+    # Images per YOLO forward pass when detecting across samples
+    DETECTION_BATCH_SIZE: int = 32
+    # YOLO input size; 416/320 cut conv FLOPs ~2.4x/~4x. Lower it only after checking that
+    # panel counts on a held-out set stay within the scoring tolerance (count_diff <= 2).
+    YOLO_IMGSZ: int = 640
+
     # --- Storage Settings ---
     STORAGE_DIR: str = str(BASE_DIR / "storage")
 
@@ -35,5 +47,7 @@ class Settings(BaseSettings):
 # Instantiate settings
 settings = Settings()
 
-# Ensure storage directory exists (for saving artefacts)
-os.makedirs(settings.STORAGE_DIR, exist_ok=True)
\ No newline at end of file
+
+def init_storage():
+    """Ensure storage directory exists (for saving artefacts). Called once at pipeline startup."""
+    os.makedirs(settings.STORAGE_DIR, exist_ok=True)
\ No newline at end of file
@@ -2,42 +2,115 @@
 
 import pandas as pd
 import asyncio
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Relative imports
-from services.satellite_analysis import satellite_verification
-from core.config import settings  # Needed for STORAGE_DIR
+from services.satellite_analysis import (
+    SatelliteImages, Detection, fetch_satellite_images, prepare_detection_batch, infer_detection_batch,
+    build_satellite_result
+)
+from core.config import settings, init_storage  # Needed for STORAGE_DIR, MAX_CONCURRENCY, PIPELINE_WINDOW_SIZE and DETECTION_BATCH_SIZE
 
 # --- FILE PATHS ---
 # Assuming the input is in 'input_data/samples.csv' or similar location relative to BASE_DIR
 # Change this path to match your exact input file name/location if different
-INPUT_FILE = Path(__file__).resolve().parent.parent.parent / "input_data" / "samples.csv"
-OUTPUT_DIR = Path(__file__).resolve().parent.parent.parent / "deliverables" / "prediction_files"
+_BASE = Path(__file__).resolve().parents[2]
+INPUT_FILE = _BASE / "input_data" / "samples.csv"
+OUTPUT_DIR = _BASE / "deliverables" / "prediction_files"
 OUTPUT_FILE = OUTPUT_DIR / f"verification_predictions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
 
 
-async def process_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+def _failure_record(sample: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    sample_id = str(sample['sample_id'])
+    print(f"CRITICAL ERROR processing sample {sample_id}: {error}")
+    return {
+        "sample_id": sample_id,
+        "lat": sample['latitude'],
+        "lon": sample['longitude'],
+        "has_solar": False,
+        "confidence": 0.0,
+        "qc_status": "NOT_VERIFIABLE",
+        "details": f"CRITICAL PIPELINE FAILURE: {str(error)}",
+        "pv_area_sqm_est": 0.0,
+        "buffer_radius_sqft": 0,
+        "bbox_or_mask": "",
+        "image_metadata": {}
+    }
+
+
+async def fetch_sample(sample: Dict[str, Any]) -> SatelliteImages:
     """
-    Runs the satellite verification pipeline for a single sample and formats the output.
+    Fetch phase for a single sample: retrieves its pre/post-install scenes.
     """
     sample_id = str(sample['sample_id'])
     lat = sample['latitude']
     lon = sample['longitude']
-    declared_panels = sample['declared_panel_count']
-    submission_date = sample['submission_date']  # Assumed field in input data
 
     print(f"--- Processing Sample ID: {sample_id} at ({lat}, {lon}) ---")
 
+    return await fetch_satellite_images(lat, lon, sample['submission_date'])
+
+
+def detect_all(fetched: List[Any]) -> Dict[Tuple[int, str], Detection]:
+    """
+    Detect phase: runs YOLO over every fetched image from all samples in chunks of
+    DETECTION_BATCH_SIZE, returning detections keyed by (sample index, "pre"/"post").
+    """
+    contents: List[bytes] = []
+    owners: List[Tuple[int, str]] = []
+    for index, images in enumerate(fetched):
+        if isinstance(images, Exception):
+            continue
+        for phase, content in (("pre", images.pre_content), ("post", images.post_content)):
+            if content is not None:
+                contents.append(content)
+                owners.append((index, phase))
+
+    detections: Dict[Tuple[int, str], Detection] = {}
+    batch_size = settings.DETECTION_BATCH_SIZE
+    starts = range(0, len(contents), batch_size)
+    chunks = [contents[start:start + batch_size] for start in starts]
+
+    # Double-buffered: the next chunk is hashed/decoded in a thread while the model
+    # runs on the current one, so CPU decode overlaps with inference
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(prepare_detection_batch, chunks[0]) if chunks else None
+        for n, start in enumerate(starts):
+            prepared = pending.result()
+            if n + 1 < len(chunks):
+                pending = prefetcher.submit(prepare_detection_batch, chunks[n + 1])
+
+            batch = infer_detection_batch(prepared)
+            detections.update(zip(owners[start:start + batch_size], batch))
+    return detections
+
+
+def process_sample(
+        sample: Dict[str, Any],
+        images: SatelliteImages,
+        pre_detection: Optional[Detection],
+        post_detection: Optional[Detection]
+) -> Dict[str, Any]:
+    """
+    Scores a single sample from its detections and formats the output.
+    """
+    sample_id = str(sample['sample_id'])
+    lat = sample['latitude']
+    lon = sample['longitude']
+    declared_panels = sample['declared_panel_count']
+
     try:
         # Run the core verification logic
-        result = await satellite_verification(
-            lat=lat,
-            lon=lon,
+        result = build_satellite_result(
+            images,
+            pre_detection,
+            post_detection,
             declared_panel_count=declared_panels,
-            submission_date=submission_date,
             sample_id=sample_id
         )
 
@@ -63,28 +136,30 @@ async def process_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
         return output_record
 
     except Exception as e:
-        print(f"CRITICAL ERROR processing sample {sample_id}: {e}")
-        return {
-            "sample_id": sample_id,
-            "lat": lat,
-            "lon": lon,
-            "has_solar": False,
-            "confidence": 0.0,
-            "qc_status": "NOT_VERIFIABLE",
-            "details": f"CRITICAL PIPELINE FAILURE: {str(e)}",
-            "pv_area_sqm_est": 0.0,
-            "buffer_radius_sqft": 0,
-            "bbox_or_mask": "",
-            "image_metadata": {}
-        }
+        return _failure_record(sample, e)
+
+
+def score_sample(
+        index: int,
+        sample: Dict[str, Any],
+        images: Any,
+        detections: Dict[Tuple[int, str], Detection]
+) -> Dict[str, Any]:
+    """
+    Score phase for one sample; images is the fetch result or the exception it raised.
+    """
+    if isinstance(images, Exception):
+        return _failure_record(sample, images)
+    return process_sample(sample, images, detections.get((index, "pre")), detections.get((index, "post")))
 
 
 async def main_pipeline():
     """
     Main function to run the batch verification pipeline.
     """
-    # 1. Ensure output directory exists
+    # 1. Ensure output and artefact storage directories exist
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    init_storage()
 
     # 2. Read Input Data
     try:
@@ -111,15 +186,39 @@ async def main_pipeline():
         df['submission_date'] = datetime.now().isoformat()
         print("Warning: 'submission_date' not found. Using current date.")
 
-    # 3. Process Samples Asynchronously
+    # 3. Process Samples in windows of PIPELINE_WINDOW_SIZE, each going through three phases
+    # so YOLO runs on batches spanning many samples. Only the current window's images are
+    # held in memory
     # Convert DataFrame rows to a list of dicts for processing
     samples_to_process = df.to_dict('records')
 
-    # Create tasks for parallel execution (important for I/O-bound tasks like API calls)
-    tasks = [process_sample(sample) for sample in samples_to_process]
+    # 3a. Fetch phase: parallel execution (important for I/O-bound tasks like API calls),
+    # with at most MAX_CONCURRENCY samples requesting imagery at once
+    sem = asyncio.Semaphore(settings.MAX_CONCURRENCY)
+
+    async def fetch_sample_bounded(sample: Dict[str, Any]) -> SatelliteImages:
+        async with sem:
+            return await fetch_sample(sample)
+
+    all_results: List[Dict[str, Any]] = []
+    window_size = settings.PIPELINE_WINDOW_SIZE
+    # The per-sample scoring cost is dominated by the artefact file write, which releases
+    # the GIL, so samples are scored on a thread pool
+    with ThreadPoolExecutor() as pool:
+        for start in range(0, len(samples_to_process), window_size):
+            window = samples_to_process[start:start + window_size]
+
+            # Run the window's tasks and wait for results (gather preserves input order)
+            tasks = [fetch_sample_bounded(sample) for sample in window]
+            fetched = await asyncio.gather(*tasks, return_exceptions=True)
+
+            # 3b. Detect phase: batched YOLO across the window's samples
+            detections = detect_all(fetched)
 
-    # Run all tasks and wait for results
-    all_results = await asyncio.gather(*tasks)
+            # 3c. Score and format each sample (map preserves input order)
+            all_results.extend(pool.map(
+                score_sample, range(len(window)), window, fetched, repeat(detections)
+            ))
 
     # 4. Write Final JSON Output
     final_output = {
@@ -128,8 +227,9 @@ async def main_pipeline():
         "results": all_results
     }
 
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(final_output, f, indent=4)
+    # orjson encodes in C and passes numpy scalars from YOLO through natively
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(orjson.dumps(final_output, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"\n✅ Pipeline completed successfully.")
     print(f"Results written to: {OUTPUT_FILE}")
@@ -1,6 +1,12 @@
 # deliverables/pipeline_code/models/application.py
-from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, Optional
+
+import msgspec
+from msgspec import Meta
+
+# Plain typed structs: one result is built per sample, so these skip per-instance
+# validation. Meta constraints are documentation and are enforced when decoding.
+UnitScore = Annotated[float, Meta(ge=0.0, le=1.0)]
 
 
 # --- ENUM for QC Status (Mandatory Output) ---
@@ -10,29 +16,31 @@ class QCStatus:
 
 
 # --- Metric Scores (General) ---
-class MetricScore(BaseModel):
-    score: float = Field(..., ge=0.0, le=1.0)
+class MetricScore(msgspec.Struct, kw_only=True):
+    score: UnitScore
     details: Optional[str] = None
 
 
 # --- Satellite Analysis Specific Result (Core Objective Output) ---
-class SatelliteAnalysisResult(BaseModel):
-    score: float = Field(..., ge=0.0, le=1.0)
+class SatelliteAnalysisResult(msgspec.Struct, kw_only=True):
+    score: UnitScore
     details: str
 
     # Quantification and Detection Results
     pre_install_panel_count: int
     post_install_panel_count: int
-    pv_area_sqm_est: float = Field(..., description="Estimated total PV area in square meters (m²)")
-    yolo_confidence: float = Field(..., ge=0.0, le=1.0)
+    # Estimated total PV area in square meters (m²)
+    pv_area_sqm_est: float
+    yolo_confidence: UnitScore
 
     # NEW FIELD: To specify the final buffer size used for the post-install quantification (Core Objective 2)
     final_buffer_sqft: int
 
     # Explainability/Auditability
-    qc_status: str = Field(..., description="VERIFIABLE or NOT_VERIFIABLE")
-    image_metadata: dict = Field(default_factory=dict)
+    # VERIFIABLE or NOT_VERIFIABLE
+    qc_status: str
+    image_metadata: dict = msgspec.field(default_factory=dict)
 
     # NEW FIELD: For the audit artifact filename/path (Core Objective 5)
-    artifact_filename: str = Field(...,
-                                   description="Filename/path for the saved audit overlay image (bbox_or_mask in challenge output)")
\ No newline at end of file
+    # Filename/path for the saved audit overlay image (bbox_or_mask in challenge output)
+    artifact_filename: str
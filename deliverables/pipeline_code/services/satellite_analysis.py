@@ -1,16 +1,21 @@
 # deliverables/pipeline_code/services/satellite_analysis.py
 
+import asyncio
+import math
 import numpy as np
 import cv2
-from typing import Tuple, Optional, Dict
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from functools import lru_cache
+from collections import OrderedDict
 from pathlib import Path
 from datetime import timedelta, datetime
+import hashlib
 import json
+import threading
 
 # --- SENTINEL HUB IMPORTS ---
 from sentinelhub import (
-    SentinelHubSession, BBox, CRS, DataCollection, MimeType,
+    SentinelHubSession, SentinelHubDownloadClient, BBox, CRS, DataCollection, MimeType,
     SHConfig, SentinelHubRequest
 )
 from shapely.geometry import Point
@@ -41,9 +46,9 @@ TARGET_RADII_M = {
 # --- 1. AUTHENTICATION & SESSION MANAGEMENT ---
 
 @lru_cache
-def get_sh_session() -> SentinelHubSession:
+def get_sh_config() -> SHConfig:
     """
-    Creates and caches the Sentinel Hub session.
+    Creates and caches the Sentinel Hub configuration with the pipeline credentials.
     """
     config = SHConfig()
 
@@ -60,27 +65,69 @@ def get_sh_session() -> SentinelHubSession:
     if not config.sh_client_id or not config.sh_client_secret:
         raise ValueError("Sentinel Hub credentials are not configured.")
 
+    return config
+
+
+@lru_cache
+def get_sh_session() -> SentinelHubSession:
+    """
+    Creates and caches the Sentinel Hub session. Its token is refreshed on access
+    shortly before it expires, so one session serves the whole run.
+    """
     try:
-        # We rely on SHConfig being picked up by SentinelHubSession()
-        return SentinelHubSession(config=config)
+        return SentinelHubSession(config=get_sh_config())
     except Exception as e:
         print(f"Error during Sentinel Hub authentication: {e}")
         raise
 
 
+@lru_cache
+def get_sh_download_client() -> SentinelHubDownloadClient:
+    """
+    Creates and caches the download client bound to the shared session, so every
+    request reuses one token and its connection pool instead of authenticating anew.
+    """
+    return SentinelHubDownloadClient(config=get_sh_config(), session=get_sh_session())
+
+
 # --- 2. GEOMETRY UTILITY ---
+MIN_IMAGE_SIZE_PX = 100  # Enforce minimum 100x100 pixels
+
+
+class BufferGeometry(NamedTuple):
+    """Latitude-independent request geometry for one buffer size."""
+    radius_m: float
+    delta_lat: float  # Half-height of the bbox in degrees
+    size: Tuple[int, int]  # Output image size in pixels
+
+
+def _buffer_geometry(radius_m: float) -> BufferGeometry:
+    # 2 * radius_m is the bounding box edge length in meters
+    edge_px = int(2 * radius_m / IMAGE_RESOLUTION_M)
+    size = (max(edge_px, MIN_IMAGE_SIZE_PX), max(edge_px, MIN_IMAGE_SIZE_PX))
+    return BufferGeometry(radius_m, radius_m / 110540, size)
+
+
+# Built once per buffer bucket; only the longitude half-width depends on the site latitude.
+# Every request for a bucket therefore sends the same output size.
+BUFFER_GEOMETRY = {sqft: _buffer_geometry(radius_m) for sqft, radius_m in TARGET_RADII_M.items()}
+
+
+def get_buffer_geometry(buffer_radius_sqft: int) -> BufferGeometry:
+    """Returns the precomputed geometry for a buffer size (unknown sizes use 2400 sqft)."""
+    return BUFFER_GEOMETRY.get(buffer_radius_sqft, BUFFER_GEOMETRY[2400])
+
+
 # FIX: Updated return type to include radius_m and logic to calculate image size
 def get_bbox_from_point(lat: float, lon: float, buffer_radius_sqft: int) -> Tuple[BBox, float]:
     """
     Calculates a small BBox that encompasses the required circular buffer.
     Returns: BBox, radius_m
     """
-    radius_m = TARGET_RADII_M.get(buffer_radius_sqft, TARGET_RADII_M[2400])
+    radius_m, delta_lat, _ = get_buffer_geometry(buffer_radius_sqft)
 
     # Approximate degree change for the radius (simplified for small areas)
-    lat_rad = np.radians(lat)
-    delta_lon = radius_m / (111320 * np.cos(lat_rad))
-    delta_lat = radius_m / 110540
+    delta_lon = radius_m / (111320 * math.cos(math.radians(lat)))
 
     bbox_coords = [
         lon - delta_lon, lat - delta_lat,
@@ -126,13 +173,41 @@ function evaluatePixel(sample) {
 """
 
 # --- 4. YOLO MODEL LOADING ---
-CUSTOM_MODEL_PATH = Path(__file__).parent.parent.parent / "trained_model_file" / "best.pt"
+CUSTOM_MODEL_PATH = Path(__file__).resolve().parents[2] / "trained_model_file" / "best.pt"
+# FP16 TensorRT engine exported next to the weights on the first CUDA run. The inference
+# size is part of the name so changing YOLO_IMGSZ triggers a fresh export.
+ENGINE_PATH = CUSTOM_MODEL_PATH.with_name(f"{CUSTOM_MODEL_PATH.stem}_{settings.YOLO_IMGSZ}.engine")
+
+
+def _load_tensorrt_engine():
+    """Returns the FP16 TensorRT engine, exporting it once if it is not on disk yet."""
+    from ultralytics import YOLO
+
+    if not ENGINE_PATH.exists():
+        print("Exporting YOLO weights to a TensorRT FP16 engine (one-time)...")
+        # Dynamic batch up to the detection batch size so every chunk fits one engine
+        exported = YOLO(str(CUSTOM_MODEL_PATH)).export(
+            format="engine", half=True, imgsz=settings.YOLO_IMGSZ, device=0,
+            dynamic=True, batch=settings.DETECTION_BATCH_SIZE
+        )
+        Path(exported).replace(ENGINE_PATH)
+
+    return YOLO(str(ENGINE_PATH), task="segment")
 
 
 @lru_cache
 def get_yolo_model():
     """Loads the YOLO model only once, on first access, and caches the result."""
     from ultralytics import YOLO  # Assumes ultralytics is installed
+    import torch
+
+    if torch.cuda.is_available():
+        try:
+            return _load_tensorrt_engine()
+        except Exception as e:
+            # e.g. TensorRT not installed; the PyTorch weights still run on the GPU
+            print(f"Warning: TensorRT engine unavailable, using PyTorch weights: {e}")
+
     try:
         # Load your custom segmentation weights
         return YOLO(str(CUSTOM_MODEL_PATH))
@@ -141,8 +216,74 @@ def get_yolo_model():
         return None
 
 
+@lru_cache(maxsize=1)
+def use_half_precision() -> bool:
+    """
+    FP16 inference on CUDA hosts. Ultralytics uploads the uint8 batch and does the
+    /255 normalization on the device, so this also halves that work; CPU stays FP32.
+    """
+    import torch
+    return torch.cuda.is_available()
+
+
 # --- 5. IMAGE FETCHING ---
 
+class _NoImageData(Exception):
+    """Raised when Sentinel Hub returns no usable scene; keeps failures out of the cache."""
+
+
+# Successful fetches are cached per (site, window, buffer). Coordinates are rounded
+# to 5 decimals (~1 m) so repeat rows for the same site share one request.
+SH_IMAGE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=SH_IMAGE_CACHE_SIZE)
+def _request_sh_image(
+        lat: float,
+        lon: float,
+        time_interval: Tuple[str, str],
+        buffer_radius_sqft: int,
+) -> Tuple[bytes, Dict[str, str]]:
+    """Performs the Sentinel Hub request; raises instead of returning empty results."""
+    bbox, _ = get_bbox_from_point(lat, lon, buffer_radius_sqft)
+    # Output size is fixed per buffer bucket, precomputed at import
+    size = list(get_buffer_geometry(buffer_radius_sqft).size)
+
+    request = SentinelHubRequest(
+        # FIX: Removed 'session=session'
+        evalscript=EVALSCRIPT_TRUE_COLOR_RGB_JPEG,
+        input_data=[
+            SentinelHubRequest.input_data(
+                data_collection=DATA_COLLECTION,
+                time_interval=time_interval,
+                maxcc=MAX_CLOUD_COVERAGE,
+                mosaicking_order='leastCC'  # Select the least cloudy scene
+            )
+        ],
+        responses=[
+            # FIX: Replaced MimeType.JPEG with MimeType.JPG
+            SentinelHubRequest.output_response("default", MimeType.JPG),
+            SentinelHubRequest.output_response("userdata", MimeType.JSON)  # Get metadata
+        ],
+        bbox=bbox,
+        size=size,
+        config=get_sh_config()
+    )
+
+    data = get_sh_download_client().download(request.download_list, decode_data=True)
+
+    if data and len(data) == 2:
+        image_content = data[0]
+        metadata = data[1]['userdata']  # Extracting the metadata response
+
+        # Extract sensing time from metadata for auditability
+        sensing_time = metadata.get('tileDate', 'N/A')
+
+        return image_content, {"source": DATA_COLLECTION.name, "capture_date": sensing_time}
+
+    raise _NoImageData()
+
+
 def fetch_sh_image(
         lat: float,
         lon: float,
@@ -152,53 +293,14 @@ def fetch_sh_image(
     """
     Fetches the best available Sentinel Hub image and metadata.
     """
-    session = None
     try:
-        session = get_sh_session()
-        # FIX: Unpack both BBox and radius_m
-        bbox, radius_m = get_bbox_from_point(lat, lon, buffer_radius_sqft)
-
-        # FIX: Calculate size correctly using radius_m (2 * radius_m is the bounding box edge length in meters)
-        total_width_m = 2 * radius_m
-        total_height_m = 2 * radius_m
-
-        size_x = int(total_width_m / IMAGE_RESOLUTION_M)
-        size_y = int(total_height_m / IMAGE_RESOLUTION_M)
-        size = [max(size_x, 100), max(size_y, 100)]  # Enforce minimum 100x100 pixels
-
-        request = SentinelHubRequest(
-            # FIX: Removed 'session=session'
-            evalscript=EVALSCRIPT_TRUE_COLOR_RGB_JPEG,
-            input_data=[
-                SentinelHubRequest.input_data(
-                    data_collection=DATA_COLLECTION,
-                    time_interval=time_interval,
-                    maxcc=MAX_CLOUD_COVERAGE,
-                    mosaicking_order='leastCC'  # Select the least cloudy scene
-                )
-            ],
-            responses=[
-                # FIX: Replaced MimeType.JPEG with MimeType.JPG
-                SentinelHubRequest.output_response("default", MimeType.JPG),
-                SentinelHubRequest.output_response("userdata", MimeType.JSON)  # Get metadata
-            ],
-            bbox=bbox,
-            size=size
+        image_content, metadata = _request_sh_image(
+            round(lat, 5), round(lon, 5), tuple(time_interval), buffer_radius_sqft
         )
+        return image_content, dict(metadata)
 
-        data = request.get_data()
-
-        if data and len(data) == 2:
-            image_content = data[0]
-            metadata = data[1]['userdata']  # Extracting the metadata response
-
-            # Extract sensing time from metadata for auditability
-            sensing_time = metadata.get('tileDate', 'N/A')
-
-            return image_content, {"source": DATA_COLLECTION.name, "capture_date": sensing_time}
-
+    except _NoImageData:
         return None, {}
-
     except Exception as e:
         # Check if the error is a '400 Bad Request' which often means no data found
         print(f"Sentinel Hub API Error for {lat}, {lon}: {e}")
@@ -206,84 +308,231 @@ def fetch_sh_image(
 
 
 # --- 6. YOLO DETECTION AND QUANTIFICATION ---
-def run_yolo_detection(image_content: bytes) -> Tuple[int, float, float, Optional[bytes]]:
+
+# (panel_count, avg_confidence, total_pv_area_sqm, overlay_image_bytes)
+Detection = Tuple[int, float, float, Optional[bytes]]
+EMPTY_DETECTION: Detection = (0, 0.0, 0.0, None)
+
+# Detection results keyed by a digest of the image bytes, so an image seen again
+# (e.g. the same cached scene for repeated rows) skips decode + inference.
+DETECTION_CACHE_SIZE = 256
+_DETECTION_CACHE: "OrderedDict[str, Detection]" = OrderedDict()
+# Batches are prepared in a worker thread while the model runs, so cache access is locked
+_DETECTION_CACHE_LOCK = threading.Lock()
+
+
+# cv2.imencode's default JPEG quality, kept so the audit artefacts look the same
+OVERLAY_JPEG_QUALITY = 95
+
+
+@lru_cache(maxsize=1)
+def get_turbojpeg():
     """
-    Runs YOLO segmentation, estimates area, and returns overlay image.
-    Returns: (panel_count, avg_confidence, total_pv_area_sqm, overlay_image_bytes)
+    Loads libjpeg-turbo through PyTurboJPEG once; None when the package or the
+    shared library is missing, in which case images are decoded and overlays are
+    encoded with OpenCV.
     """
-    YOLO_MODEL = get_yolo_model()
-    if YOLO_MODEL is None:
-        # Return dummy values if model loading failed
-        return 0, 0.0, 0.0, None
+    try:
+        from turbojpeg import TurboJPEG
+        return TurboJPEG()
+    except Exception as e:
+        print(f"PyTurboJPEG unavailable, using OpenCV for JPEG coding: {e}")
+        return None
+
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+
+def decode_image(image_content: bytes) -> Optional[np.ndarray]:
+    """Decodes image bytes to a BGR array; JPEGs use SIMD libjpeg-turbo when available."""
+    jpeg = get_turbojpeg()
+    if jpeg is not None and image_content[:3] == JPEG_MAGIC:
+        try:
+            return jpeg.decode(image_content)  # BGR, same layout as cv2.imdecode
+        except Exception as e:
+            print(f"TurboJPEG decode failed, retrying with OpenCV: {e}")
 
     nparr = np.frombuffer(image_content, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
-    if image is None:
-        return 0, 0.0, 0.0, None
 
-    # Run inference
-    # YOLO for segmentation/detection
-    results = YOLO_MODEL(image, verbose=False)
+def encode_overlay(image: np.ndarray) -> Optional[bytes]:
+    """Encodes a BGR overlay to JPEG bytes with SIMD libjpeg-turbo when available."""
+    jpeg = get_turbojpeg()
+    if jpeg is not None:
+        # TurboJPEG defaults to BGR input and raises on failure
+        return jpeg.encode(np.ascontiguousarray(image), quality=OVERLAY_JPEG_QUALITY)
 
-    panel_count = 0
-    total_conf = 0.0
-    total_pixel_area = 0.0
-    overlay_image_bytes = None
+    is_success, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, OVERLAY_JPEG_QUALITY])
+    return buffer.tobytes() if is_success else None
 
-    # Factor based on the Sentinel-2 10m resolution (10m * 10m = 100 sqm/pixel)
-    PIXEL_TO_SQM_FACTOR = IMAGE_RESOLUTION_M * IMAGE_RESOLUTION_M
 
-    for r in results:
-        # Sum of the area of all detected masks in pixels
-        if r.masks is not None:
-            # Check if there are masks before trying to sum area
-            if r.masks.area is not None:
-                total_pixel_area = r.masks.area().sum().item()
+# Factor based on the Sentinel-2 10m resolution (10m * 10m = 100 sqm/pixel)
+PIXEL_TO_SQM_FACTOR = IMAGE_RESOLUTION_M * IMAGE_RESOLUTION_M
+
 
-        panel_boxes = r.boxes
-        panel_count = len(panel_boxes)
+def _summarize_results(results) -> List[Detection]:
+    """
+    Reduces YOLO results to counts/area and renders their audit overlays.
+    The per-result reductions stay on the device and reach the host in a single
+    transfer for the whole batch, instead of two .item() syncs per result.
+    """
+    import torch
 
-        if panel_count > 0:
-            total_conf = sum(panel_boxes.conf.tolist())
-            avg_confidence = total_conf / panel_count
+    panel_counts, stats = [], []
+    for r in results:
+        conf = r.boxes.conf
+        # Box count is tensor metadata; no device sync
+        panel_counts.append(conf.shape[0])
+        # Average box confidence; an empty mean would be NaN
+        avg_confidence = conf.mean() if conf.shape[0] > 0 else conf.new_zeros(())
+        # Sum of the area of all detected masks in pixels
+        if r.masks is not None and r.masks.area is not None:
+            total_pixel_area = r.masks.area().sum()
         else:
-            avg_confidence = 0.0
+            total_pixel_area = conf.new_zeros(())
+        stats.append(torch.stack([
+            avg_confidence.float(), total_pixel_area.to(device=conf.device, dtype=torch.float32)
+        ]))
+
+    if not stats:
+        return []
+    host_stats = torch.stack(stats).tolist()
 
+    detections = []
+    for r, panel_count, (avg_confidence, total_pixel_area) in zip(results, panel_counts, host_stats):
         # Create the audit artifact (overlay image)
         im_with_boxes = r.plot(labels=False, conf=False)  # Plot without labels/conf for clean look
-        is_success, buffer = cv2.imencode(".jpg", im_with_boxes)
-        if is_success:
-            overlay_image_bytes = buffer.tobytes()
+        overlay_image_bytes = encode_overlay(im_with_boxes)
 
-    total_pv_area_sqm = total_pixel_area * PIXEL_TO_SQM_FACTOR
+        total_pv_area_sqm = total_pixel_area * PIXEL_TO_SQM_FACTOR
+        detections.append((panel_count, avg_confidence, total_pv_area_sqm, overlay_image_bytes))
 
-    return panel_count, avg_confidence, total_pv_area_sqm, overlay_image_bytes
+    return detections
 
 
-# --- 7. MAIN ORCHESTRATOR ---
-async def satellite_verification(
-        lat: float,
-        lon: float,
-        declared_panel_count: int,
-        submission_date: str,
-        sample_id: str
-) -> SatelliteAnalysisResult:
+class PreparedBatch(NamedTuple):
+    """CPU-side half of a detection batch: cache hits filled in, the rest decoded."""
+    detections: List[Optional[Detection]]
+    pending_slots: Dict[str, List[int]]
+    images: List[np.ndarray]
+    keys: List[str]
+
+
+def prepare_detection_batch(image_contents: List[bytes]) -> PreparedBatch:
     """
-    Orchestrates the complete satellite verification process and generates artifacts.
+    Hashes and decodes a batch without touching the model, so it can run in a
+    worker thread while the previous batch is being inferred.
+    Cached and duplicate images are not decoded; undecodable images get EMPTY_DETECTION.
+    """
+    detections: List[Optional[Detection]] = [None] * len(image_contents)
+    pending_slots: Dict[str, List[int]] = {}
+    images, keys = [], []
+
+    for slot, image_content in enumerate(image_contents):
+        key = hashlib.blake2b(image_content, digest_size=8).hexdigest()
+
+        with _DETECTION_CACHE_LOCK:
+            cached = _DETECTION_CACHE.get(key)
+            if cached is not None:
+                _DETECTION_CACHE.move_to_end(key)
+        if cached is not None:
+            detections[slot] = cached
+            continue
+        if key in pending_slots:
+            pending_slots[key].append(slot)
+            continue
+
+        image = decode_image(image_content)
+        if image is None:
+            detections[slot] = EMPTY_DETECTION
+            continue
+
+        pending_slots[key] = [slot]
+        images.append(image)
+        keys.append(key)
+
+    return PreparedBatch(detections, pending_slots, images, keys)
+
+
+def infer_detection_batch(batch: PreparedBatch) -> List[Detection]:
+    """
+    Runs YOLO segmentation on a prepared batch in one forward pass.
+    Returns one detection per input, in input order.
+    """
+    model = get_yolo_model()
+    if model is None:
+        # Return dummy values if model loading failed
+        return [EMPTY_DETECTION] * len(batch.detections)
+
+    detections = list(batch.detections)
+
+    if batch.images:
+        # Run inference
+        # YOLO for segmentation/detection, one result per input image
+        results = model(batch.images, imgsz=settings.YOLO_IMGSZ, half=use_half_precision(), verbose=False)
+
+        for key, detection in zip(batch.keys, _summarize_results(results)):
+            with _DETECTION_CACHE_LOCK:
+                _DETECTION_CACHE[key] = detection
+                if len(_DETECTION_CACHE) > DETECTION_CACHE_SIZE:
+                    _DETECTION_CACHE.popitem(last=False)
+            for slot in batch.pending_slots[key]:
+                detections[slot] = detection
+
+    return detections
+
+
+def run_yolo_detection_batch(image_contents: List[bytes]) -> List[Detection]:
+    """
+    Runs YOLO segmentation on many images in one batched forward pass.
+    Returns one detection per input, in input order.
+    """
+    return infer_detection_batch(prepare_detection_batch(image_contents))
+
+
+def run_yolo_detection(image_content: bytes) -> Detection:
     """
+    Runs YOLO segmentation, estimates area, and returns overlay image.
+    Returns: (panel_count, avg_confidence, total_pv_area_sqm, overlay_image_bytes)
+    """
+    return run_yolo_detection_batch([image_content])[0]
+
+
+# --- 7. MAIN ORCHESTRATOR ---
+
+# NOTE ON BUFFERS (Core Objective 2 Logic):
+PRE_INSTALL_BUFFER_SQFT = 2400
+FINAL_BUFFER_SQFT_USED = 1200
+
+
+class SatelliteImages(NamedTuple):
+    """Pre/post-install scenes for one sample; content is None when a fetch failed."""
+    pre_content: Optional[bytes]
+    pre_metadata: Dict[str, str]
+    post_content: Optional[bytes]
+    post_metadata: Dict[str, str]
 
+
+def _parse_submission_date(submission_date: str) -> datetime:
     # FIX: Use strptime to explicitly parse the DD-MM-YYYY format from the CSV.
     try:
-        submission_dt = datetime.strptime(submission_date.split('T')[0], '%d-%m-%Y')
+        return datetime.strptime(submission_date.split('T')[0], '%d-%m-%Y')
     except ValueError as e:
         # Fallback to ISO format parsing in case the CSV changed its format (YYYY-MM-DD)
         try:
-            submission_dt = datetime.fromisoformat(submission_date.split('T')[0])
+            return datetime.fromisoformat(submission_date.split('T')[0])
         except ValueError:
             # If both fail, raise the error to be caught by the main pipeline
             raise ValueError(f"Date parsing failed for '{submission_date}'. Expected formats DD-MM-YYYY or YYYY-MM-DD.")
 
+
+async def fetch_satellite_images(lat: float, lon: float, submission_date: str) -> SatelliteImages:
+    """
+    Fetch phase: retrieves the pre- and post-install scenes for one sample (I/O only).
+    """
+    submission_dt = _parse_submission_date(submission_date)
+
     # 7.1 Define Time Ranges
     # Pre-install: Look 6 months prior to submission date
     six_months_ago = (submission_dt - timedelta(days=180)).isoformat().split('T')[0]
@@ -292,24 +541,38 @@ async def satellite_verification(
     # Post-install: Look from submission date up to now
     post_install_period = (submission_dt.isoformat().split('T')[0], datetime.now().isoformat().split('T')[0])
 
-    # NOTE ON BUFFERS (Core Objective 2 Logic):
-    FINAL_BUFFER_SQFT_USED = 1200
+    # 7.2 Fetch Pre-install (2400 sq ft buffer) and Post-install (1200 sq ft buffer - Core Objective 3)
+    # images concurrently. fetch_sh_image is blocking, so each runs in a worker thread.
+    (pre_content, pre_metadata), (post_content, post_metadata) = await asyncio.gather(
+        asyncio.to_thread(fetch_sh_image, lat, lon, pre_install_period, PRE_INSTALL_BUFFER_SQFT),
+        asyncio.to_thread(fetch_sh_image, lat, lon, post_install_period, FINAL_BUFFER_SQFT_USED),
+    )
+    return SatelliteImages(pre_content, pre_metadata, post_content, post_metadata)
 
-    # 7.2 Fetch Pre-install Image (2400 sq ft buffer)
-    pre_content, pre_metadata = fetch_sh_image(lat, lon, pre_install_period, 2400)
+
+def build_satellite_result(
+        images: SatelliteImages,
+        pre_detection: Optional[Detection],
+        post_detection: Optional[Detection],
+        declared_panel_count: int,
+        sample_id: str
+) -> SatelliteAnalysisResult:
+    """
+    Scoring phase: turns one sample's detections into its result and saves the audit artifact.
+    Detections are None for images that were not fetched.
+    """
+    pre_metadata = images.pre_metadata
+    post_metadata = images.post_metadata
 
     # 7.3 Handle Pre-install Image Fetch Failure
-    if pre_content is None:
+    if pre_detection is None:
         pre_count = 0
     else:
-        # 7.4 Run YOLO on Pre-install Image
-        pre_count, _, _, _ = run_yolo_detection(pre_content)
-
-    # 7.5 Fetch Post-install Image (1200 sq ft buffer - Core Objective 3)
-    post_content, post_metadata = fetch_sh_image(lat, lon, post_install_period, FINAL_BUFFER_SQFT_USED)
+        # 7.4 YOLO result for the Pre-install Image
+        pre_count = pre_detection[0]
 
     # 7.6 Handle Post-install Image Failure
-    if post_content is None:
+    if post_detection is None:
         # Cannot confirm installation without a post-install image.
         return SatelliteAnalysisResult(
             score=0.0, details="Post-installation image fetch failed. Cannot confirm installation.",
@@ -318,8 +581,8 @@ async def satellite_verification(
             final_buffer_sqft=FINAL_BUFFER_SQFT_USED, artifact_filename=""
         )
 
-    # 7.7 Run YOLO on Post-install Image & Generate Artifact
-    post_count, post_conf, post_area, overlay_image_bytes = run_yolo_detection(post_content)
+    # 7.7 YOLO result for the Post-install Image & Generate Artifact
+    post_count, post_conf, post_area, overlay_image_bytes = post_detection
 
     # --- ARTIFACT STORAGE (Core Objective 5) ---
     artifact_filename = ""
@@ -374,4 +637,26 @@ async def satellite_verification(
         image_metadata=post_metadata,
         final_buffer_sqft=FINAL_BUFFER_SQFT_USED,
         artifact_filename=artifact_filename
-    )
\ No newline at end of file
+    )
+
+
+async def satellite_verification(
+        lat: float,
+        lon: float,
+        declared_panel_count: int,
+        submission_date: str,
+        sample_id: str
+) -> SatelliteAnalysisResult:
+    """
+    Orchestrates the complete satellite verification process and generates artifacts.
+    main_pipeline runs the same phases across many samples to batch YOLO between them.
+    """
+    images = await fetch_satellite_images(lat, lon, submission_date)
+
+    # Pre and post images share one forward pass
+    contents = [c for c in (images.pre_content, images.post_content) if c is not None]
+    detections = iter(run_yolo_detection_batch(contents))
+    pre_detection = next(detections) if images.pre_content is not None else None
+    post_detection = next(detections) if images.post_content is not None else None
+
+    return build_satellite_result(images, pre_detection, post_detection, declared_panel_count, sample_id)